@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+from .models import ExtractionResult
+from .serialize import load_result
+
+try:
+    import numpy as np
+except ImportError as exc:  # pragma: no cover - depende del entorno
+    raise ImportError("extractor.analysis requiere numpy (pip install -e .[analysis])") from exc
+
+
+AccountKey = Tuple[str, str, Optional[str]]   # (bank, name, last4)
+
+INFLOW = 1
+OUTFLOW = -1
+
+_FORMAT_BY_SUFFIX = {".json": "json", ".msgpack": "msgpack", ".csv": "csv"}
+
+
+@dataclass(frozen=True)
+class MonthlyTotals:
+    account: AccountKey
+    month: str            # YYYY-MM
+    inflow: float
+    outflow: float        # positivo (magnitud)
+    net: float
+    count: int
+
+
+@dataclass(frozen=True)
+class MonthlyBalance:
+    account: AccountKey
+    month: str
+    average: float
+    samples: int
+
+
+@dataclass(frozen=True)
+class Row:
+    account: AccountKey
+    date: str
+    description: str
+    amount: float
+    balance: Optional[float]
+
+
+class StatementTable:
+    """
+    Tabla columnar (NumPy) con las transacciones de muchos ExtractionResult.
+
+    Columnas (todas de largo n):
+    - day:       int64, días desde 1970-01-01 (datetime64[D])
+    - cents:     int64, monto con signo en centavos
+    - balance:   int64, balance en centavos (válido donde has_balance)
+    - account:   int32, índice en `accounts`
+    - direction: int8, +1 entrada / -1 salida / 0 monto cero
+
+    Las cuentas se identifican por (bank, name, last4): varios statements de la
+    misma cuenta quedan en el mismo id.
+    """
+
+    def __init__(
+        self,
+        day: "np.ndarray",
+        cents: "np.ndarray",
+        balance: "np.ndarray",
+        has_balance: "np.ndarray",
+        account: "np.ndarray",
+        description: "np.ndarray",
+        accounts: Sequence[AccountKey],
+    ):
+        self.day = day
+        self.cents = cents
+        self.balance = balance
+        self.has_balance = has_balance
+        self.account = account
+        self.direction = np.sign(cents).astype(np.int8)
+        self.description = description
+        self.accounts: List[AccountKey] = list(accounts)
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    @classmethod
+    def from_results(cls, results: Iterable[ExtractionResult]) -> "StatementTable":
+        account_ids: Dict[AccountKey, int] = {}
+        dates: List[str] = []
+        amounts: List[float] = []
+        balances: List[float] = []
+        acc_idx: List[int] = []
+        descriptions: List[str] = []
+
+        for r in results:
+            for a in r.accounts:
+                key = (r.bank, a.name, a.last4)
+                aid = account_ids.setdefault(key, len(account_ids))
+                txs = a.transactions
+                dates.extend(t.date for t in txs)
+                amounts.extend(t.amount for t in txs)
+                balances.extend(float("nan") if t.balance is None else t.balance for t in txs)
+                descriptions.extend(t.description for t in txs)
+                acc_idx.extend([aid] * len(txs))
+
+        bal = np.asarray(balances, dtype=np.float64)
+        has_balance = ~np.isnan(bal)
+        return cls(
+            day=np.asarray(dates, dtype="datetime64[D]").astype(np.int64),
+            cents=np.rint(np.asarray(amounts, dtype=np.float64) * 100).astype(np.int64),
+            balance=np.where(has_balance, np.rint(np.nan_to_num(bal) * 100), 0).astype(np.int64),
+            has_balance=has_balance,
+            account=np.asarray(acc_idx, dtype=np.int32),
+            description=np.asarray(descriptions, dtype=object),
+            accounts=list(account_ids),
+        )
+
+    # --- consultas ---
+
+    def _take(self, mask: "np.ndarray") -> "StatementTable":
+        return StatementTable(
+            day=self.day[mask],
+            cents=self.cents[mask],
+            balance=self.balance[mask],
+            has_balance=self.has_balance[mask],
+            account=self.account[mask],
+            description=self.description[mask],
+            accounts=self.accounts,
+        )
+
+    def account_ids(self, name: Optional[str] = None, last4: Optional[str] = None, bank: Optional[str] = None) -> List[int]:
+        return [
+            i
+            for i, (b, n, l4) in enumerate(self.accounts)
+            if (name is None or n.lower() == name.lower())
+            and (last4 is None or l4 == last4)
+            and (bank is None or b.lower() == bank.lower())
+        ]
+
+    def where(
+        self,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        accounts: Optional[Sequence[int]] = None,
+        direction: Optional[int] = None,
+    ) -> "StatementTable":
+        """
+        Filtra por rango de fechas (inclusive), magnitud del monto, ids de cuenta y
+        dirección (INFLOW / OUTFLOW). Devuelve una tabla nueva.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if start is not None:
+            mask &= self.day >= np.datetime64(start, "D").astype(np.int64)
+        if end is not None:
+            mask &= self.day <= np.datetime64(end, "D").astype(np.int64)
+        if min_amount is not None or max_amount is not None:
+            mag = np.abs(self.cents)
+            if min_amount is not None:
+                mask &= mag >= round(min_amount * 100)
+            if max_amount is not None:
+                mask &= mag <= round(max_amount * 100)
+        if accounts is not None:
+            mask &= np.isin(self.account, np.asarray(list(accounts), dtype=np.int32))
+        if direction is not None:
+            mask &= self.direction == direction
+        return self._take(mask)
+
+    # --- agregaciones ---
+
+    def _month_groups(self) -> Tuple["np.ndarray", "np.ndarray", int]:
+        """
+        Clave de grupo (cuenta, mes) como un entero denso: account * n_months + (mes - mes_min).
+        """
+        months = self.day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        m0 = int(months.min()) if len(months) else 0
+        n_months = int(months.max()) - m0 + 1 if len(months) else 1
+        return self.account.astype(np.int64) * n_months + (months - m0), np.int64(m0), n_months
+
+    @staticmethod
+    def _month_label(m: int) -> str:
+        return str(np.datetime64(int(m), "M"))
+
+    def monthly_totals(self) -> List[MonthlyTotals]:
+        if not len(self):
+            return []
+        key, m0, n_months = self._month_groups()
+        size = len(self.accounts) * n_months
+        inflow = np.bincount(key, weights=np.where(self.cents > 0, self.cents, 0), minlength=size)
+        outflow = np.bincount(key, weights=np.where(self.cents < 0, -self.cents, 0), minlength=size)
+        count = np.bincount(key, minlength=size)
+
+        out: List[MonthlyTotals] = []
+        for k in np.flatnonzero(count):
+            aid, moff = divmod(int(k), n_months)
+            out.append(
+                MonthlyTotals(
+                    account=self.accounts[aid],
+                    month=self._month_label(m0 + moff),
+                    inflow=inflow[k] / 100,
+                    outflow=outflow[k] / 100,
+                    net=(inflow[k] - outflow[k]) / 100,
+                    count=int(count[k]),
+                )
+            )
+        return out
+
+    def average_balances(self) -> List[MonthlyBalance]:
+        """
+        Promedio de los balances impresos por cuenta y mes.
+        """
+        if not len(self):
+            return []
+        key, m0, n_months = self._month_groups()
+        size = len(self.accounts) * n_months
+        key = key[self.has_balance]
+        total = np.bincount(key, weights=self.balance[self.has_balance], minlength=size)
+        count = np.bincount(key, minlength=size)
+
+        out: List[MonthlyBalance] = []
+        for k in np.flatnonzero(count):
+            aid, moff = divmod(int(k), n_months)
+            out.append(
+                MonthlyBalance(
+                    account=self.accounts[aid],
+                    month=self._month_label(m0 + moff),
+                    average=round(total[k] / count[k] / 100, 2),
+                    samples=int(count[k]),
+                )
+            )
+        return out
+
+    def largest(self, n: int = 5, per_account: bool = True) -> List[Row]:
+        """
+        Las n transacciones de mayor magnitud (por cuenta, o global).
+        """
+        if not len(self) or n <= 0:
+            return []
+        mag = np.abs(self.cents)
+        if per_account:
+            order = np.lexsort((-mag, self.account))
+            acc_sorted = self.account[order]
+            starts = np.searchsorted(acc_sorted, acc_sorted, side="left")
+            rank = np.arange(len(order)) - starts
+            idx = order[rank < n]
+        else:
+            idx = np.argsort(-mag, kind="stable")[:n]
+        return [self._row(int(i)) for i in idx]
+
+    def _row(self, i: int) -> Row:
+        return Row(
+            account=self.accounts[self.account[i]],
+            date=str(np.datetime64(int(self.day[i]), "D")),
+            description=str(self.description[i]),
+            amount=self.cents[i] / 100,
+            balance=self.balance[i] / 100 if self.has_balance[i] else None,
+        )
+
+
+def load_results(paths: Iterable[Path]) -> List[ExtractionResult]:
+    """
+    Lee resultados escritos por el pipeline; el formato se deduce de la extensión.
+    """
+    out: List[ExtractionResult] = []
+    for p in paths:
+        p = Path(p)
+        fmt = _FORMAT_BY_SUFFIX.get(p.suffix.lower())
+        if fmt is None:
+            raise ValueError(f"Extensión no soportada: {p}")
+        with p.open("rb") as fh:
+            out.append(load_result(fh, fmt))
+    return out
+
+
+def _account_label(key: AccountKey) -> str:
+    bank, name, last4 = key
+    return f"{bank} {name}" + (f" ...{last4}" if last4 else "")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bank Statement Extractor - análisis de resultados")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("files", nargs="+", help="Resultados del pipeline (.json / .msgpack / .csv)")
+    common.add_argument("--start", type=datetime.date.fromisoformat, default=None, help="Desde (YYYY-MM-DD)")
+    common.add_argument("--end", type=datetime.date.fromisoformat, default=None, help="Hasta (YYYY-MM-DD)")
+    common.add_argument("--account", default=None, help="Nombre de cuenta (Checking, Savings...)")
+    common.add_argument("--last4", default=None, help="Últimos 4 dígitos de la cuenta")
+    common.add_argument("--min-amount", type=float, default=None, help="Monto mínimo (magnitud)")
+    common.add_argument("--max-amount", type=float, default=None, help="Monto máximo (magnitud)")
+    common.add_argument("--direction", choices=("in", "out"), default=None, help="Solo entradas / salidas")
+
+    sub.add_parser("monthly", parents=[common], help="Entradas / salidas por cuenta y mes")
+    sub.add_parser("balances", parents=[common], help="Balance promedio por cuenta y mes")
+    p_largest = sub.add_parser("largest", parents=[common], help="Transacciones más grandes por cuenta")
+    p_largest.add_argument("-n", type=int, default=5, help="Cantidad por cuenta")
+
+    args = parser.parse_args()
+
+    table = StatementTable.from_results(load_results(args.files))
+    accounts = None
+    if args.account or args.last4:
+        accounts = table.account_ids(name=args.account, last4=args.last4)
+    table = table.where(
+        start=args.start,
+        end=args.end,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        accounts=accounts,
+        direction={"in": INFLOW, "out": OUTFLOW, None: None}[args.direction],
+    )
+
+    console = Console()
+    if args.command == "monthly":
+        t = Table("Cuenta", "Mes", "Entradas", "Salidas", "Neto", "Movs")
+        for r in table.monthly_totals():
+            t.add_row(_account_label(r.account), r.month, f"{r.inflow:,.2f}", f"{r.outflow:,.2f}", f"{r.net:,.2f}", str(r.count))
+    elif args.command == "balances":
+        t = Table("Cuenta", "Mes", "Balance promedio", "Muestras")
+        for r in table.average_balances():
+            t.add_row(_account_label(r.account), r.month, f"{r.average:,.2f}", str(r.samples))
+    else:
+        t = Table("Cuenta", "Fecha", "Descripción", "Monto")
+        for r in table.largest(args.n):
+            t.add_row(_account_label(r.account), r.date, r.description, f"{r.amount:,.2f}")
+    console.print(t)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from ..detect import detect_pdf
-from ..models import Account, ExtractionResult
-from ..segment import segment_transaction_history
+from typing import List, Optional
+
+from ..budget import PAGE_CODES, Budget, BudgetExceeded, BudgetMeter
+from ..detect import DocumentInfo, detect_pdf
+from ..metrics import DOCUMENTS, RECONCILIATION_FAILURES, ROWS, STAGE_SECONDS
+from ..models import Account, ExtractionError, ExtractionResult, Transaction
+from ..reconcile import reconciles
+from ..segment import AccountSection, segment_transaction_history
 from ..parse import parse_transactions_from_lines
-from ..normalize import apply_sign_heuristics
+from ..normalize import DEFAULT_SIGN_RULES, SignRules, apply_sign_heuristics
+from ..source import PdfSource, open_pdf
+from .wells_fargo_layout import extract_transactions_layout
 
 
 def _forward_fill_balances(txs):
@@ -20,44 +27,124 @@ def _forward_fill_balances(txs):
     return txs
 
 
-def extract(pdf_path: str) -> ExtractionResult:
-    info = detect_pdf(pdf_path)
+STRATEGIES = ("auto", "text", "layout")
 
-    sections = segment_transaction_history(pdf_path)
 
-    accounts: list[Account] = []
+def extract(
+    source: PdfSource,
+    budget: Optional[Budget] = None,
+    sign_rules: SignRules = DEFAULT_SIGN_RULES,
+    strategy: str = "auto",
+) -> ExtractionResult:
+    """
+    Extrae el statement completo. El PDF se abre una sola vez y se comparte entre etapas.
 
-    for s in sections:
-        # Normalizar header
-        raw = (s.header_line or "").strip().lower()
-
-        # Si la "header_line" es realmente el encabezado de columnas, no es nombre de cuenta
-        if "date" in raw and "description" in raw:
-            # Buscar en el contexto cercano el nombre real del account
-            ctx = " ".join(s.context_lines or []).lower()
-            if "savings" in ctx:
-                account_name = "Savings"
-            elif "checking" in ctx:
-                account_name = "Checking"
-            else:
-                account_name = "Checking"
-        else:
-            # En caso de que venga bien (p.ej. "Checking" / "Savings")
-            account_name = (s.header_line or "Checking").strip()
+    strategy:
+    - "auto": parser de texto (barato) y, solo para las cuentas que no concilian contra
+      los balances impresos, el parser por layout (coordenadas, más caro).
+    - "text" / "layout": fuerza un solo parser.
 
-        # Parsear transacciones del section
-        txs = parse_transactions_from_lines(s.lines, info.statement_year)
+    Si se pasa un Budget y el documento lo excede
+    (tiempo o memoria) se devuelve un resultado sin cuentas con el error estructurado;
+    las páginas que exceden su límite se saltan y quedan en `errors`.
+    """
+    meter = (budget or Budget()).start()
+    status = "error"
+    try:
+        with STAGE_SECONDS.time("document"), open_pdf(source) as pdf:
+            result = _extract(pdf, meter, sign_rules, strategy)
+        status = "ok"
+        return result
+    except BudgetExceeded as exc:
+        status = "budget"
+        return ExtractionResult(bank="Wells Fargo", errors=[*meter.errors, exc.to_error()])
+    except MemoryError:
+        status = "budget"
+        return ExtractionResult(
+            bank="Wells Fargo",
+            errors=[*meter.errors, ExtractionError(code="memory", message="MemoryError durante la extracción")],
+        )
+    finally:
+        DOCUMENTS.inc(1, status)
+
+
+def _text_tier(s: AccountSection, info: DocumentInfo, sign_rules: SignRules) -> List[Transaction]:
+    with STAGE_SECONDS.time("text"):
+        # Parsear transacciones de la cuenta (todas sus páginas ya vienen unidas)
+        txs = parse_transactions_from_lines(s.lines, info.statement_year, info.period_end)
 
         # Signos (+/-)
-        txs = apply_sign_heuristics(txs)
+        txs = apply_sign_heuristics(txs, sign_rules)
 
         # Completar balances faltantes
-        txs = _forward_fill_balances(txs)
+        return _forward_fill_balances(txs)
+
+
+def _layout_tier(pdf: PdfSource, s: AccountSection, info: DocumentInfo, meter: BudgetMeter) -> Optional[List[Transaction]]:
+    """
+    Parser por columnas solo sobre la franja de la cuenta en cada página. None si alguna página
+    excede su presupuesto (queda registrado y se mantiene el resultado de texto).
+    """
+    try:
+        with STAGE_SECONDS.time("layout"):
+            return extract_transactions_layout(
+                pdf, s.page_indexes, info.statement_year, meter, info.period_end, page_bounds=s.page_bounds
+            )
+    except BudgetExceeded as exc:
+        if exc.code not in PAGE_CODES:
+            raise
+        meter.skip(exc)
+        return None
+
+
+def _extract(pdf: PdfSource, meter: BudgetMeter, sign_rules: SignRules, strategy: str) -> ExtractionResult:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia desconocida: {strategy!r} (opciones: {', '.join(STRATEGIES)})")
+
+    with STAGE_SECONDS.time("detect"):
+        info = detect_pdf(pdf, meter)
+
+    with STAGE_SECONDS.time("segment"):
+        sections = segment_transaction_history(pdf, meter)
+
+    accounts: list[Account] = []
+
+    for s in sections:
+        txs: Optional[List[Transaction]] = None
+        ok: Optional[bool] = None
+        tier = "text"
+
+        if strategy != "layout":
+            txs = _text_tier(s, info, sign_rules)
+            ok = reconciles(txs, s.begin_balance, s.end_balance)
+            if ok is False:
+                RECONCILIATION_FAILURES.inc(1, "text")
+
+        # Escalar al parser por layout solo si el texto no concilia
+        if s.page_indexes and (strategy == "layout" or (strategy == "auto" and ok is False)):
+            layout_txs = _layout_tier(pdf, s, info, meter)
+            if layout_txs is not None:
+                layout_ok = reconciles(layout_txs, s.begin_balance, s.end_balance)
+                if layout_ok is False:
+                    RECONCILIATION_FAILURES.inc(1, "layout")
+                if txs is None or layout_ok is not False:
+                    txs, ok, tier = layout_txs, layout_ok, "layout"
+
+        if txs is None:
+            # layout forzado pero fuera de presupuesto: queda el parser de texto
+            txs = _text_tier(s, info, sign_rules)
+            ok = reconciles(txs, s.begin_balance, s.end_balance)
 
+        ROWS.inc(len(txs), tier)
         accounts.append(
             Account(
-                name=account_name,
+                name=s.name,
+                last4=s.last4,
                 currency="USD",
+                begin_balance=s.begin_balance,
+                end_balance=s.end_balance,
+                tier=tier,
+                reconciled=ok,
                 transactions=txs,
             )
         )
@@ -65,5 +152,8 @@ def extract(pdf_path: str) -> ExtractionResult:
     return ExtractionResult(
         bank="Wells Fargo",
         statement_year=info.statement_year,
+        period_start=info.period_start.isoformat() if info.period_start else None,
+        period_end=info.period_end.isoformat() if info.period_end else None,
         accounts=accounts,
+        errors=meter.errors,
     )
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import datetime
 import re
-from typing import Dict, List, Optional
-
-import pdfplumber
+from typing import Dict, List, Optional, Tuple
 
+from ..budget import Budget, BudgetMeter
 from ..models import Transaction
+from ..parse import resolve_date
+from ..source import PdfSource, open_pdf
 
 
 DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})$")
@@ -51,16 +52,26 @@ def _group_words_by_line(words: List[Dict], y_tol: float = 2.0) -> List[List[Dic
 
 
 def extract_transactions_layout(
-    pdf_path: str,
+    source: PdfSource,
     page_indexes: List[int],
     statement_year: Optional[int],
+    meter: Optional[BudgetMeter] = None,
+    period_end: Optional[datetime.date] = None,
+    page_bounds: Optional[Dict[int, Tuple[float, float]]] = None,
 ) -> List[Transaction]:
     """
     Extrae transacciones por columnas (layout) usando coordenadas X.
     - amount se decide por columna: Additions => + , Subtractions => -
     - balance solo si aparece en columna Balance
+
+    page_bounds: franja vertical (top, bottom) de las filas de la cuenta en cada página,
+    tal como la registra el segmentador. Sin ella se usa la tabla entre el primer header
+    "Date" y el primer "Ending" de la página (incorrecto si dos cuentas comparten página).
+
+    Si una página excede el presupuesto (objetos/chars antes de agrupar palabras, tiempo)
+    se lanza BudgetExceeded: quien llama decide volver al parser de texto.
     """
-    year = statement_year or datetime.date.today().year
+    meter = meter or Budget().start()
 
     # Rangos X basados en tu debug (page width 612)
     X_DATE_MAX = 100
@@ -71,22 +82,30 @@ def extract_transactions_layout(
 
     txs: List[Transaction] = []
 
-    with pdfplumber.open(pdf_path) as pdf:
+    with open_pdf(source) as pdf:
         for pi in page_indexes:
             page = pdf.pages[pi]
-            words = page.extract_words()
-
-            # localizar la cabecera "Date ... balance" para definir región vertical
-            header_tops = [w["top"] for w in words if w["text"] == "Date" and w["x0"] < 120]
-            start_y = min(header_tops) + 6 if header_tops else 0
-
-            # (CORREGIDO) indentación del ending_candidates
-            ending_candidates = [
-                w["top"]
-                for w in words
-                if w["text"] == "Ending" and w["x0"] < 120 and w["top"] > start_y
-            ]
-            end_y = min(ending_candidates) - 2 if ending_candidates else page.height
+            with meter.page(pi):
+                meter.check_page_objects(page, pi)
+                meter.check_layout_chars(page, pi)
+                words = page.extract_words()
+
+            bounds = page_bounds.get(pi) if page_bounds else None
+            if bounds is not None:
+                # filas de esta cuenta según el segmentador
+                start_y, end_y = bounds[0] - 1, bounds[1]
+            else:
+                # localizar la cabecera "Date ... balance" para definir región vertical
+                header_tops = [w["top"] for w in words if w["text"] == "Date" and w["x0"] < 120]
+                start_y = min(header_tops) + 6 if header_tops else 0
+
+                # (CORREGIDO) indentación del ending_candidates
+                ending_candidates = [
+                    w["top"]
+                    for w in words
+                    if w["text"] == "Ending" and w["x0"] < 120 and w["top"] > start_y
+                ]
+                end_y = min(ending_candidates) - 2 if ending_candidates else page.height
 
             # solo palabras dentro del área de la tabla
             table_words = [w for w in words if (w["top"] >= start_y and w["top"] <= end_y)]
@@ -132,12 +151,8 @@ def extract_transactions_layout(
                     # nueva transacción => flush anterior
                     flush_current()
 
-                    mm = int(dm.group(1))
-                    dd = int(dm.group(2))
-                    try:
-                        current_date = datetime.date(year, mm, dd).isoformat()
-                    except ValueError:
-                        current_date = None
+                    d = resolve_date(int(dm.group(1)), int(dm.group(2)), statement_year, period_end)
+                    current_date = d.isoformat() if d else None
 
                     current_desc_parts = []
                     if desc_tokens:
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from pdfplumber.utils.exceptions import PdfminerException
+
+from .metrics import PAGES_SKIPPED
+from .models import ExtractionError
+
+
+T = TypeVar("T")
+
+# violaciones que solo descartan la página; el resto (timeout, memory) corta el documento
+PAGE_CODES = frozenset({"page_timeout", "page_objects", "layout_chars"})
+
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    Límites por documento y por página. None = sin límite.
+
+    - timeout_s / page_timeout_s: tiempo de reloj (wall-clock).
+    - max_page_objects: objetos de la página (chars, rects, líneas, imágenes...);
+      se revisa antes de extraer texto y la página se salta si lo supera.
+    - max_layout_chars: chars de la página antes de agrupar palabras (extract_words);
+      si se supera, el parser por layout no se usa y queda el de texto (parse.py).
+    - max_memory_mb: crecimiento del RSS del proceso desde que empezó el documento,
+      revisado entre páginas (un worker que ya retuvo memoria de un PDF grande no
+      hace fallar a los siguientes).
+    """
+
+    timeout_s: Optional[float] = None
+    page_timeout_s: Optional[float] = None
+    max_page_objects: Optional[int] = None
+    max_layout_chars: Optional[int] = None
+    max_memory_mb: Optional[float] = None
+
+    def start(self) -> "BudgetMeter":
+        return BudgetMeter(self)
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, code: str, message: str, page: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.page = page
+
+    def to_error(self) -> ExtractionError:
+        return ExtractionError(code=self.code, message=self.message, page=self.page)
+
+
+def _rss_mb() -> Optional[float]:
+    """
+    RSS actual del proceso en MB. En Linux se lee /proc (barato); en otros sistemas
+    se usa el pico de ru_maxrss como aproximación.
+    """
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            pages = int(fh.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KB en Linux, bytes en macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _budget_cause(exc: BaseException) -> Optional["BudgetExceeded"]:
+    """
+    pdfplumber (page.layout) re-lanza cualquier excepción como PdfminerException(e):
+    recupera el BudgetExceeded de la alarma si viene envuelto.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, BudgetExceeded):
+            return exc
+        seen.add(id(exc))
+        inner = exc.args[0] if exc.args and isinstance(exc.args[0], BaseException) else None
+        exc = inner or exc.__cause__ or exc.__context__
+    return None
+
+
+@contextmanager
+def _unwrap_budget() -> Iterator[None]:
+    try:
+        yield
+    except PdfminerException as exc:
+        inner = _budget_cause(exc)
+        if inner is None:
+            raise
+        raise inner from None
+
+
+def _can_use_alarm() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+class BudgetMeter:
+    """
+    Estado del presupuesto de un documento en curso.
+
+    En el hilo principal (CLI, workers del daemon) los timeouts se aplican con SIGALRM,
+    así una llamada lenta de pdfplumber se interrumpe. En otros hilos los límites se
+    revisan entre páginas.
+    """
+
+    def __init__(self, budget: Budget):
+        self.budget = budget
+        self.started = time.monotonic()
+        self.deadline = self.started + budget.timeout_s if budget.timeout_s else None
+        self.errors: List[ExtractionError] = []
+        self.rss_start = _rss_mb() if budget.max_memory_mb is not None else None
+
+    def _remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def check(self, page: Optional[int] = None) -> None:
+        """
+        Revisión cooperativa de tiempo y memoria del documento.
+        """
+        remaining = self._remaining()
+        if remaining is not None and remaining <= 0:
+            raise BudgetExceeded("timeout", f"Documento excedió {self.budget.timeout_s}s", page)
+
+        if self.budget.max_memory_mb is not None and self.rss_start is not None:
+            rss = _rss_mb()
+            if rss is not None and rss - self.rss_start > self.budget.max_memory_mb:
+                raise BudgetExceeded(
+                    "memory",
+                    f"Memoria creció {rss - self.rss_start:.0f}MB (límite {self.budget.max_memory_mb:.0f}MB por documento)",
+                    page,
+                )
+
+    def check_page_objects(self, page, pidx: int) -> None:
+        limit = self.budget.max_page_objects
+        if limit is None:
+            return
+        n = sum(len(v) for v in page.objects.values())
+        if n > limit:
+            raise BudgetExceeded("page_objects", f"Página con {n} objetos (límite {limit})", pidx)
+
+    def check_layout_chars(self, page, pidx: int) -> None:
+        limit = self.budget.max_layout_chars
+        if limit is None:
+            return
+        n = len(page.chars)
+        if n > limit:
+            raise BudgetExceeded("layout_chars", f"Página con {n} chars (límite {limit}) para layout", pidx)
+
+    def skip(self, exc: BudgetExceeded) -> None:
+        """
+        Registra una violación a nivel de página y sigue con el documento.
+        """
+        err = exc.to_error()
+        if err not in self.errors:
+            self.errors.append(err)
+            PAGES_SKIPPED.inc(1, exc.code)
+
+    def run_page(self, pidx: int, page, fn: Callable[[], T]) -> Optional[T]:
+        """
+        Ejecuta fn() para una página dentro del presupuesto. Si la página lo excede
+        se registra el error y devuelve None; los límites del documento se propagan.
+        """
+        try:
+            with self.page(pidx):
+                self.check_page_objects(page, pidx)
+                return fn()
+        except BudgetExceeded as exc:
+            if exc.code not in PAGE_CODES:
+                raise
+            self.skip(exc)
+            return None
+
+    @contextmanager
+    def page(self, pidx: int) -> Iterator[None]:
+        """
+        Envuelve el trabajo de una página: revisa el documento antes y, si se puede,
+        arma una alarma con el menor entre el tiempo restante del documento y el de página.
+        """
+        self.check(pidx)
+
+        remaining = self._remaining()
+        limits = [x for x in (remaining, self.budget.page_timeout_s) if x is not None]
+        if not limits or not _can_use_alarm():
+            page_started = time.monotonic()
+            with _unwrap_budget():
+                yield
+            if self.budget.page_timeout_s is not None and time.monotonic() - page_started > self.budget.page_timeout_s:
+                raise BudgetExceeded("page_timeout", f"Página excedió {self.budget.page_timeout_s}s", pidx)
+            return
+
+        seconds = max(min(limits), 0.001)
+        is_page_limit = remaining is None or (
+            self.budget.page_timeout_s is not None and self.budget.page_timeout_s < remaining
+        )
+
+        fired: List[BudgetExceeded] = []
+
+        def _on_alarm(signum, frame):
+            if is_page_limit:
+                exc = BudgetExceeded("page_timeout", f"Página excedió {self.budget.page_timeout_s}s", pidx)
+            else:
+                exc = BudgetExceeded("timeout", f"Documento excedió {self.budget.timeout_s}s", pidx)
+            fired.append(exc)
+            raise exc
+
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+        try:
+            with _unwrap_budget():
+                yield
+            if fired:
+                # pdfminer tiene `except Exception` internos que pueden tragarse la alarma
+                raise fired[0]
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def add_budget_arguments(parser: argparse.ArgumentParser) -> None:
+    g = parser.add_argument_group("límites por documento")
+    g.add_argument("--timeout", type=float, default=None, help="Segundos máximos por documento")
+    g.add_argument("--page-timeout", type=float, default=None, help="Segundos máximos por página")
+    g.add_argument("--max-page-objects", type=int, default=None, help="Objetos máximos por página (se salta la página)")
+    g.add_argument("--max-layout-chars", type=int, default=None, help="Chars máximos por página para el parser por layout")
+    g.add_argument("--max-memory-mb", type=float, default=None, help="Crecimiento máximo de memoria (RSS, MB) por documento")
+
+
+def budget_from_args(args: argparse.Namespace) -> Optional[Budget]:
+    budget = Budget(
+        timeout_s=args.timeout,
+        page_timeout_s=args.page_timeout,
+        max_page_objects=args.max_page_objects,
+        max_layout_chars=args.max_layout_chars,
+        max_memory_mb=args.max_memory_mb,
+    )
+    return None if budget == Budget() else budget
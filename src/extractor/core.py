@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from .banks.wells_fargo import STRATEGIES, extract as extract_wells
+from .budget import Budget
+from .models import ExtractionResult
+from .normalize import DEFAULT_SIGN_RULES, SignRules
+from .source import PdfSource
+
+
+class Extractor:
+    """
+    Punto de entrada reutilizable: se construye una vez (reglas compiladas + configuración)
+    y se comparte entre hilos. No guarda estado por documento; cada llamada abre su propio
+    PDF, una sola vez, y lo pasa por todas las etapas.
+
+    strategy="auto" usa el parser de texto y solo recurre al de layout para las cuentas
+    que no concilian (ver banks.wells_fargo.extract).
+
+    Acepta rutas, bytes, memoryview, mmap o cualquier objeto con read()/seek():
+
+        extractor = Extractor(budget=Budget(timeout_s=30))
+        result = extractor.extract(upload.read())
+    """
+
+    def __init__(
+        self,
+        budget: Optional[Budget] = None,
+        sign_rules: SignRules = DEFAULT_SIGN_RULES,
+        strategy: str = "auto",
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia desconocida: {strategy!r} (opciones: {', '.join(STRATEGIES)})")
+        self.budget = budget
+        self.sign_rules = sign_rules
+        self.strategy = strategy
+
+    def extract(self, source: PdfSource) -> ExtractionResult:
+        return extract_wells(source, budget=self.budget, sign_rules=self.sign_rules, strategy=self.strategy)
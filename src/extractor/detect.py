@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import datetime
 import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Tuple
 
-import pdfplumber
+from .budget import Budget, BudgetMeter
+from .metrics import CACHE_REQUESTS
+from .source import PdfSource, content_hash, open_pdf
 
 
 @dataclass(frozen=True)
@@ -13,43 +18,243 @@ class DocumentInfo:
     is_digital_pdf: bool
     pages: int
     statement_year: Optional[int]
+    period_start: Optional[datetime.date] = None
+    period_end: Optional[datetime.date] = None
 
 
+# Franja superior de la primera página donde los bancos imprimen fecha / periodo
+HEADER_FRACTION = 0.15
+# Heurística digital: chars mínimos en las primeras páginas
+MIN_DIGITAL_CHARS = 200
+# Si el encabezado no trae fecha: páginas de cuerpo donde buscar el periodo / año
+BODY_PAGES = 3
+
+_MONTHS = {
+    m: i
+    for i, names in enumerate(
+        (
+            ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+            ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+            ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+        ),
+        start=1,
+    )
+    for m in names
+}
+
+_NUM_DATE = r"(\d{1,2})/(\d{1,2})/(\d{2,4})"
+_TEXT_DATE = r"([A-Za-z]{3,9})\.? (\d{1,2}),? (\d{4})"
+
+_PERIOD_NUM_RE = re.compile(_NUM_DATE + r"\s*(?:-|–|to|through|thru)\s*" + _NUM_DATE, re.IGNORECASE)
+_PERIOD_TEXT_RE = re.compile(_TEXT_DATE + r"\s*(?:-|–|to|through|thru)\s*" + _TEXT_DATE, re.IGNORECASE)
+_TEXT_DATE_RE = re.compile(r"\b" + _TEXT_DATE)
 _YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_FULL_NUM_DATE_RE = re.compile(r"\b" + _NUM_DATE + r"\b")
+_PDF_DATE_RE = re.compile(r"^(?:D:)?(\d{4})(\d{2})(\d{2})")
+
+
+def _num_date(mm: str, dd: str, yy: str) -> Optional[datetime.date]:
+    year = int(yy) + (2000 if len(yy) == 2 else 0)
+    try:
+        return datetime.date(year, int(mm), int(dd))
+    except ValueError:
+        return None
+
 
+def _text_date(month: str, dd: str, yyyy: str) -> Optional[datetime.date]:
+    mm = _MONTHS.get(month.lower())
+    if mm is None:
+        return None
+    try:
+        return datetime.date(int(yyyy), mm, int(dd))
+    except ValueError:
+        return None
 
-def detect_pdf(pdf_path: str) -> DocumentInfo:
+
+def _parse_range(text: str) -> Tuple[Optional[datetime.date], Optional[datetime.date]]:
+    m = _PERIOD_NUM_RE.search(text)
+    if m:
+        start, end = _num_date(*m.group(1, 2, 3)), _num_date(*m.group(4, 5, 6))
+        if start and end:
+            return start, end
+
+    m = _PERIOD_TEXT_RE.search(text)
+    if m:
+        start, end = _text_date(*m.group(1, 2, 3)), _text_date(*m.group(4, 5, 6))
+        if start and end:
+            return start, end
+
+    return None, None
+
+
+def parse_statement_period(text: str) -> Tuple[Optional[datetime.date], Optional[datetime.date]]:
     """
-    Determina si el PDF tiene texto extraíble (digital) y trata de inferir el año del statement.
+    Busca el periodo del statement en el texto del encabezado:
+    - "03/12/2024 - 04/05/2024" / "March 12, 2024 through April 5, 2024" => (inicio, fin)
+    - solo la fecha del statement ("April 5, 2024", Wells Fargo) => (None, fin)
     """
-    with pdfplumber.open(pdf_path) as pdf:
-        pages = len(pdf.pages)
-        text_sample = ""
-        for i in range(min(3, pages)):
-            t = pdf.pages[i].extract_text() or ""
-            text_sample += "\n" + t
+    start, end = _parse_range(text)
+    if end:
+        return start, end
 
-        # Heurística digital: hay texto suficiente
-        is_digital = len(text_sample.strip()) > 200
+    for m in _TEXT_DATE_RE.finditer(text):
+        d = _text_date(*m.group(1, 2, 3))
+        if d:
+            return None, d
 
-        # Inferir año: buscar 20xx cerca de "Statement period" si existe
-        year = None
-        if "Statement period" in text_sample:
-            idx = text_sample.find("Statement period")
-            window = text_sample[idx : idx + 500]
-            m = _YEAR_RE.search(window)
-            if m:
-                year = int(m.group(1))
+    return None, None
 
-        if year is None:
-            # fallback: primer año que aparezca en el sample
-            m = _YEAR_RE.search(text_sample)
+
+def _body_period(texts: List[str]) -> Tuple[Optional[datetime.date], Optional[datetime.date], Optional[int]]:
+    """
+    Periodo / año a partir del texto de las primeras páginas.
+
+    Solo un rango explícito ("Fee period 03/12/2024 - 04/05/2024") define el periodo, en
+    cualquiera de las páginas. Una fecha suelta del cuerpo puede ser de una disclosure
+    ("Effective March 1, 2024"): como mucho aporta el año (el de la más reciente).
+    """
+    for text in texts:
+        start, end = _parse_range(text)
+        if end:
+            return start, end, end.year
+
+    dates = [d for text in texts for m in _FULL_NUM_DATE_RE.finditer(text) if (d := _num_date(*m.groups()))]
+    dates += [d for text in texts for m in _TEXT_DATE_RE.finditer(text) if (d := _text_date(*m.group(1, 2, 3)))]
+    if dates:
+        return None, None, max(dates).year
+
+    for text in texts:
+        m = _YEAR_RE.search(text)
+        if m:
+            return None, None, int(m.group(1))
+    return None, None, None
+
+
+def _metadata_year(metadata: dict) -> Optional[int]:
+    # Fecha de creación del PDF: solo como último recurso (puede ser posterior al statement)
+    for key in ("CreationDate", "ModDate"):
+        value = metadata.get(key)
+        if isinstance(value, str):
+            m = _PDF_DATE_RE.match(value)
             if m:
-                year = int(m.group(1))
-
-        return DocumentInfo(
-            is_pdf=True,
-            is_digital_pdf=is_digital,
-            pages=pages,
-            statement_year=year,
-        )
+                return int(m.group(1))
+    return None
+
+
+class _LRUCache:
+    """
+    Memo por hash de contenido, compartido entre hilos.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, DocumentInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[DocumentInfo]:
+        with self._lock:
+            info = self._data.get(key)
+            if info is None:
+                self.misses += 1
+                CACHE_REQUESTS.inc(1, "detect", "miss")
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            CACHE_REQUESTS.inc(1, "detect", "hit")
+            return info
+
+    def put(self, key: str, info: DocumentInfo) -> None:
+        with self._lock:
+            self._data[key] = info
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+_CACHE = _LRUCache()
+
+
+def detect_cache_info() -> Tuple[int, int]:
+    """(hits, misses) del memo de detect_pdf."""
+    return _CACHE.hits, _CACHE.misses
+
+
+def clear_detect_cache() -> None:
+    _CACHE.clear()
+
+
+def _detect(pdf, meter: BudgetMeter) -> DocumentInfo:
+    pages = len(pdf.pages)
+    if not pages:
+        return DocumentInfo(is_pdf=True, is_digital_pdf=False, pages=0, statement_year=None)
+
+    first = pdf.pages[0]
+
+    def _header_text() -> str:
+        header = first.crop((0, 0, first.width, first.height * HEADER_FRACTION))
+        return header.extract_text() or ""
+
+    header_text = meter.run_page(0, first, _header_text) or ""
+
+    # Heurística digital: hay chars suficientes (sin extraer texto de página completa)
+    chars = 0
+    for i in range(min(3, pages)):
+        page = pdf.pages[i]
+        chars += meter.run_page(i, page, lambda: len(page.chars)) or 0
+        if chars > MIN_DIGITAL_CHARS:
+            break
+    is_digital = chars > MIN_DIGITAL_CHARS
+
+    start, end = parse_statement_period(header_text)
+
+    year = end.year if end else None
+    if year is None:
+        m = _YEAR_RE.search(header_text)
+        if m:
+            year = int(m.group(1))
+    if year is None:
+        # el encabezado no trae fecha: buscar en el cuerpo antes que en la metadata
+        texts = [
+            meter.run_page(i, pdf.pages[i], pdf.pages[i].extract_text) or ""
+            for i in range(min(BODY_PAGES, pages))
+        ]
+        start, end, year = _body_period(texts)
+    if year is None:
+        year = _metadata_year(pdf.metadata or {})
+
+    return DocumentInfo(
+        is_pdf=True,
+        is_digital_pdf=is_digital,
+        pages=pages,
+        statement_year=year,
+        period_start=start,
+        period_end=end,
+    )
+
+
+def detect_pdf(source: PdfSource, meter: Optional[BudgetMeter] = None) -> DocumentInfo:
+    """
+    Determina si el PDF tiene texto extraíble (digital) y el periodo / año del statement.
+
+    Solo se lee la franja de encabezado de la primera página; si ahí no hay fecha se busca
+    en el cuerpo de las primeras páginas y, como último recurso, en la metadata del PDF. El resultado se memoiza por hash de contenido, así re-procesar
+    el mismo documento (batch, servicio, daemon) no repite la detección.
+    """
+    meter = meter or Budget().start()
+    with open_pdf(source) as pdf:
+        key = content_hash(pdf)
+        info = _CACHE.get(key)
+        if info is None:
+            n_errors = len(meter.errors)
+            info = _detect(pdf, meter)
+            if len(meter.errors) == n_errors:
+                # no memoizar una detección degradada por el presupuesto
+                _CACHE.put(key, info)
+        return info
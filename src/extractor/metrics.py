@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_value(v: float) -> str:
+    if math.isinf(v):
+        return "+Inf" if v > 0 else "-Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[str]) -> Labels:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: se esperaban labels {self.labelnames}, llegaron {tuple(labels)}")
+        return tuple(str(x) for x in labels)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items]
+
+    def _drain(self) -> Dict[Labels, float]:
+        with self._lock:
+            out, self._values = self._values, {}
+        return out
+
+    def _merge(self, data: Dict[Labels, float]) -> None:
+        with self._lock:
+            for k, v in data.items():
+                self._values[k] = self._values.get(k, 0.0) + v
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(self.labelnames, k)} {_fmt_value(v)}" for k, v in items]
+
+    # los gauges describen el proceso que los publica: no viajan entre procesos
+    def _drain(self) -> None:
+        return None
+
+    def _merge(self, data) -> None:
+        return None
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # por labels: [conteo por bucket (no acumulado) + overflow, suma, total]
+        self._values: Dict[Labels, List] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, *labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def _render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._values.items())
+        lines: List[str] = []
+        for key, (counts, total, n) in items:
+            acc = 0
+            for bound, c in zip((*self.buckets, math.inf), counts):
+                acc += c
+                le = f'le="{_fmt_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, le)} {acc}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {n}")
+        return lines
+
+    def _drain(self) -> Dict[Labels, List]:
+        with self._lock:
+            out, self._values = self._values, {}
+        return out
+
+    def _merge(self, data: Dict[Labels, List]) -> None:
+        with self._lock:
+            for key, (counts, total, n) in data.items():
+                entry = self._values.get(key)
+                if entry is None:
+                    entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += n
+
+
+class Registry:
+    """
+    Conjunto de métricas del proceso. Actualizar una métrica es un lock + una suma en un dict,
+    así que puede quedar siempre encendido.
+
+    Con un pool de procesos, cada worker hace drain() después de cada documento y el
+    proceso principal hace merge() del snapshot: el endpoint / archivo muestra el total.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Formato de texto de Prometheus (exposition format 0.0.4).
+        """
+        lines: List[str] = []
+        for m in self._metrics.values():
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m._render())
+        return "\n".join(lines) + "\n"
+
+    def drain(self) -> Dict[str, object]:
+        """
+        Devuelve y pone en cero los contadores e histogramas (picklable).
+        """
+        out = {}
+        for name, m in self._metrics.items():
+            data = m._drain()
+            if data:
+                out[name] = data
+        return out
+
+    def merge(self, snapshot: Dict[str, object]) -> None:
+        for name, data in snapshot.items():
+            m = self._metrics.get(name)
+            if m is not None:
+                m._merge(data)
+
+    def write_textfile(self, path: Path) -> None:
+        """
+        Escribe render() de forma atómica (p.ej. para el textfile collector de node_exporter).
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(self.render())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Publica GET /metrics en un hilo daemon. Devuelve el server (server.shutdown() para cerrarlo).
+        """
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+REGISTRY = Registry()
+
+DOCUMENTS = REGISTRY.counter(
+    "extractor_documents_total", "Documentos procesados por resultado", ("status",)
+)
+PAGES = REGISTRY.counter("extractor_pages_total", "Páginas leídas por el segmentador")
+PAGES_SKIPPED = REGISTRY.counter(
+    "extractor_pages_skipped_total", "Páginas descartadas por exceder el presupuesto", ("reason",)
+)
+ROWS = REGISTRY.counter("extractor_rows_total", "Transacciones emitidas por parser", ("tier",))
+RECONCILIATION_FAILURES = REGISTRY.counter(
+    "extractor_reconciliation_failures_total", "Cuentas que no concilian contra los balances impresos", ("tier",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "extractor_cache_requests_total", "Consultas a caches internos", ("cache", "result")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "extractor_stage_seconds", "Latencia por etapa del pipeline", ("stage",)
+)
+QUEUE_DEPTH = REGISTRY.gauge("extractor_queue_depth", "Documentos en cola / en proceso en el pool de workers")
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    return REGISTRY.serve(port, host)
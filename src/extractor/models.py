@@ -15,10 +15,23 @@ class Account(BaseModel):
     name: str
     last4: Optional[str] = None
     currency: str = "USD"
+    begin_balance: Optional[float] = None
+    end_balance: Optional[float] = None
+    tier: Optional[str] = Field(None, description="Parser que produjo las transacciones: text | layout")
+    reconciled: Optional[bool] = Field(None, description="begin + sum(amounts) == end; None si no hay balances impresos")
     transactions: List[Transaction] = Field(default_factory=list)
 
 
+class ExtractionError(BaseModel):
+    code: str = Field(..., description="timeout, page_timeout, page_objects, layout_chars, memory...")
+    message: str
+    page: Optional[int] = Field(None, description="0-index page donde se disparó el límite, si aplica")
+
+
 class ExtractionResult(BaseModel):
     bank: str
     statement_year: Optional[int] = None
+    period_start: Optional[str] = Field(None, description="ISO date YYYY-MM-DD")
+    period_end: Optional[str] = Field(None, description="ISO date YYYY-MM-DD")
     accounts: List[Account] = Field(default_factory=list)
+    errors: List[ExtractionError] = Field(default_factory=list)
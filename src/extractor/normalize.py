@@ -1,44 +1,78 @@
 from __future__ import annotations
 
-from typing import List
+import re
+from dataclasses import dataclass, field
+from typing import List, Sequence
 
 from .models import Transaction
 
 
-def apply_sign_heuristics(transactions: List[Transaction]) -> List[Transaction]:
+INFLOW_KEYWORDS = (
+    "deposit",
+    "edeposit",
+    "zelle from",
+    "refund",
+    "interest",
+    "credit",
+)
+OUTFLOW_KEYWORDS = (
+    "purchase",
+    "payment",
+    "zelle to",
+    "withdrawal",
+    "fee",
+    "debit",
+    "pos",
+    "transfer debit",
+)
+
+
+def _compile_keywords(keywords: Sequence[str]) -> re.Pattern:
+    # alternancia con los más largos primero; búsqueda por substring como antes
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    if not ordered:
+        return re.compile(r"(?!)")  # nunca coincide
+    return re.compile("|".join(re.escape(k.lower()) for k in ordered))
+
+
+@dataclass(frozen=True)
+class SignRules:
+    """
+    Palabras clave para decidir el signo, compiladas una sola vez.
+    Inmutable: se puede compartir entre hilos.
+    """
+
+    inflow: Sequence[str] = INFLOW_KEYWORDS
+    outflow: Sequence[str] = OUTFLOW_KEYWORDS
+    _inflow_re: re.Pattern = field(init=False, repr=False, compare=False)
+    _outflow_re: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_inflow_re", _compile_keywords(self.inflow))
+        object.__setattr__(self, "_outflow_re", _compile_keywords(self.outflow))
+
+
+DEFAULT_SIGN_RULES = SignRules()
+
+
+def apply_sign_heuristics(transactions: List[Transaction], rules: SignRules = DEFAULT_SIGN_RULES) -> List[Transaction]:
     """
     Heurística mínima mejorada (prioridad correcta):
     - Primero marcamos INFLOW si hay señales claras (deposit, zelle from, etc.)
     - Luego marcamos OUTFLOW (purchase, zelle to, fee, etc.)
     """
-    inflow = (
-        "deposit",
-        "edeposit",
-        "zelle from",
-        "refund",
-        "interest",
-        "credit",
-    )
-    outflow = (
-        "purchase",
-        "payment",
-        "zelle to",
-        "withdrawal",
-        "fee",
-        "debit",
-        "pos",
-        "transfer debit",
-    )
+    inflow = rules._inflow_re.search
+    outflow = rules._outflow_re.search
 
     out: List[Transaction] = []
     for t in transactions:
         d = t.description.lower()
 
         # 1) inflow primero (esto corrige eDeposit)
-        if any(k in d for k in inflow):
+        if inflow(d):
             t.amount = abs(t.amount)
         # 2) outflow después
-        elif any(k in d for k in outflow):
+        elif outflow(d):
             t.amount = -abs(t.amount)
 
         out.append(t)
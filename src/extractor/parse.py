@@ -9,6 +9,37 @@ from .models import Transaction
 
 DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})\b")
 
+# margen para fechas posteriores al cierre (posteos tardíos)
+_PERIOD_SLACK = datetime.timedelta(days=7)
+
+
+def resolve_date(
+    month: int,
+    day: int,
+    statement_year: Optional[int],
+    period_end: Optional[datetime.date] = None,
+) -> Optional[datetime.date]:
+    """
+    Fecha completa para un M/D del statement.
+    Con el cierre del periodo conocido, un M/D posterior al cierre pertenece al año anterior
+    (p.ej. 12/28 en un statement que cierra el 01/05). Sin cierre se usa statement_year.
+    """
+    if period_end is None:
+        year = statement_year or datetime.date.today().year
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            return None
+
+    for year in (period_end.year, period_end.year - 1):
+        try:
+            d = datetime.date(year, month, day)
+        except ValueError:
+            continue
+        if d <= period_end + _PERIOD_SLACK:
+            return d
+    return None
+
 
 def _parse_money_candidates(line: str) -> List[float]:
     # Captura montos tipo 1,234.56
@@ -31,15 +62,17 @@ def _clean_desc(first_line: str) -> str:
     return s
 
 
-def parse_transactions_from_lines(lines: List[str], statement_year: Optional[int]) -> List[Transaction]:
+def parse_transactions_from_lines(
+    lines: List[str],
+    statement_year: Optional[int],
+    period_end: Optional[datetime.date] = None,
+) -> List[Transaction]:
     """
     Parser stateful:
     - Una transacción inicia con una línea que comienza con fecha M/D
     - Las líneas siguientes (sin fecha) se agregan a la descripción
     - El monto y balance suelen venir al final de la primera línea (Wells Fargo)
     """
-    year = statement_year or datetime.date.today().year
-
     blocks: List[List[str]] = []
     current: List[str] = []
 
@@ -59,7 +92,7 @@ def parse_transactions_from_lines(lines: List[str], statement_year: Optional[int
     if current:
         blocks.append(current)
 
-        txs: List[Transaction] = []
+    txs: List[Transaction] = []
     last_balance: Optional[float] = None
 
     for block in blocks:
@@ -68,12 +101,10 @@ def parse_transactions_from_lines(lines: List[str], statement_year: Optional[int
         if not dm:
             continue
 
-        mm = int(dm.group(1))
-        dd = int(dm.group(2))
-        try:
-            dt = datetime.date(year, mm, dd).isoformat()
-        except ValueError:
+        d = resolve_date(int(dm.group(1)), int(dm.group(2)), statement_year, period_end)
+        if d is None:
             continue
+        dt = d.isoformat()
 
         nums = _parse_money_candidates(first)
         raw_amount = None
@@ -97,7 +128,6 @@ def parse_transactions_from_lines(lines: List[str], statement_year: Optional[int
         if balance is None and last_balance is not None:
             balance = last_balance
 
-        
         txs.append(Transaction(date=dt, description=description, amount=float(raw_amount), balance=balance))
 
     return txs
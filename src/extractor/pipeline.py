@@ -1,40 +1,71 @@
 from __future__ import annotations
 
 import argparse
-import json
+import sys
 from pathlib import Path
 
 from rich.console import Console
+from rich.markup import escape
 
-from .banks.wells_fargo import extract as extract_wells
+from .banks.wells_fargo import STRATEGIES
+from .budget import add_budget_arguments, budget_from_args
+from .core import Extractor
+from .metrics import REGISTRY, STAGE_SECONDS
+from .serialize import FORMATS, write_result
 
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="Bank Statement Extractor (MVP)")
     parser.add_argument("file", help="Ruta al PDF")
-    parser.add_argument("--out", default="", help="Ruta de salida JSON (opcional)")
+    parser.add_argument("--out", default="", help="Ruta de salida (opcional)")
+    parser.add_argument("--format", default="json", choices=FORMATS, help="Formato de salida (default: json)")
+    parser.add_argument(
+        "--strategy", default="auto", choices=STRATEGIES,
+        help="auto: texto y layout solo si no concilia (default); text / layout: forzar parser",
+    )
+    parser.add_argument("--metrics-file", default="", help="Escribir métricas en formato Prometheus (opcional)")
+    add_budget_arguments(parser)
     args = parser.parse_args()
 
     pdf_path = Path(args.file)
     if not pdf_path.exists():
         raise SystemExit(f"No existe el archivo: {pdf_path}")
 
-    console = Console()
+    console = Console(stderr=not args.out)
     console.print(f"Procesando: {pdf_path}", style="bold")
 
-    result = extract_wells(str(pdf_path))
-    payload = result.model_dump()
+    extractor = Extractor(budget=budget_from_args(args), strategy=args.strategy)
+    result = extractor.extract(pdf_path)
 
-    if args.out:
-        out_path = Path(args.out)
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        console.print(f"OK -> {out_path}", style="bold green")
-    else:
-        print(json.dumps(payload, ensure_ascii=False, indent=2))
+    try:
+        if args.out:
+            out_path = Path(args.out)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            with out_path.open("wb") as fh, STAGE_SECONDS.time("serialize"):
+                write_result(result, fh, args.format)
+            console.print(f"OK -> {out_path}", style="bold green")
+        else:
+            with STAGE_SECONDS.time("serialize"):
+                write_result(result, sys.stdout.buffer, args.format)
+            if args.format in ("json", "json-compact"):
+                sys.stdout.buffer.write(b"\n")
+            sys.stdout.flush()
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
 
-    total = sum(len(a["transactions"]) for a in payload["accounts"])
+    for err in result.errors:
+        where = f" (página {err.page + 1})" if err.page is not None else ""
+        console.print(f"Límite excedido {escape(f'[{err.code}]')}{where}: {err.message}", style="bold yellow")
+
+    for acc in result.accounts:
+        status = {True: "concilia", False: "NO concilia", None: "sin balances impresos"}[acc.reconciled]
+        console.print(f"{acc.name} ({acc.last4 or '-'}): parser {acc.tier}, {status}")
+
+    total = sum(len(a.transactions) for a in result.accounts)
     console.print(f"Transacciones detectadas: {total}", style="bold cyan")
+
+    if args.metrics_file:
+        REGISTRY.write_textfile(Path(args.metrics_file))
     return 0
 
 
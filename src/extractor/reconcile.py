@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from .models import Transaction
+
+
+def reconciles(
+    transactions: List[Transaction],
+    begin_balance: Optional[float],
+    end_balance: Optional[float],
+    tol: float = 0.01,
+) -> Optional[bool]:
+    """
+    begin_balance + sum(amounts) == end_balance (balances impresos en el statement).
+    Devuelve None si el statement no trae alguno de los dos balances.
+    """
+    if begin_balance is None or end_balance is None:
+        return None
+    total = round(sum(t.amount for t in transactions), 2)
+    return abs(round(begin_balance + total, 2) - end_balance) <= tol
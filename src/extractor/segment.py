@@ -1,78 +1,182 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-import pdfplumber
+from .budget import Budget, BudgetMeter
+from .metrics import PAGES
+from .source import PdfSource, open_pdf
+
+
+class PageLine(NamedTuple):
+    text: str
+    top: float
+    bottom: float
+
+
+# una línea de página: texto solo, o con su posición vertical (extract_text_lines)
+Line = Union[str, PageLine]
 
 
 @dataclass
-class TableSection:
-    page_index: int
-    context_lines: List[str]        # líneas previas para inferir tipo de cuenta
-    header_line: Optional[str]
-    lines: List[str]                # líneas dentro de la tabla (sin header)
+class AccountSection:
+    name: str
+    last4: Optional[str]
+    header_line: Optional[str]                              # encabezado de columnas ("Date ... balance")
+    page_indexes: List[int] = field(default_factory=list)   # páginas donde hay filas de esta cuenta
+    lines: List[str] = field(default_factory=list)          # filas de la tabla (sin header), en orden
+    begin_balance: Optional[float] = None                   # "Beginning balance on M/D $X" impreso
+    end_balance: Optional[float] = None                     # "Ending balance on M/D $X" impreso
+    # por página: (top, bottom) de las filas de esta cuenta, si las líneas traían posición
+    page_bounds: Dict[int, Tuple[float, float]] = field(default_factory=dict)
 
 
-def _find_section_block(lines: List[str]) -> Optional[Tuple[int, int, Optional[str]]]:
-    """
-    Encuentra un bloque de 'Transaction history' en una página:
-    - inicio: después del header de columnas (línea que comienza con 'Date')
-    - fin: antes de 'Totals' o 'Ending balance on'
-    """
-    if "Transaction history" not in lines:
-        return None
+ACCOUNT_SUMMARY = "Statement period activity summary"
+TRANSACTION_HISTORY = "Transaction history"
 
-    start = None
-    header = None
+_ACCOUNT_NUMBER_RE = re.compile(r"Account number:\s*(\d+)")
+_ROW_RE = re.compile(r"^\d{1,2}/\d{1,2}\b")
+_BALANCE_RE = re.compile(r"^(Beginning|Ending) balance on \d{1,2}/\d{1,2}\s+(-)?\s*\$?(-)?([0-9,]+\.\d{2})")
 
-    th_idx = lines.index("Transaction history")
+# estados del recorrido
+_OUTSIDE = "outside"          # fuera de una tabla de movimientos
+_HISTORY = "history"          # vimos "Transaction history", falta el header de columnas
+_TABLE = "table"              # dentro de la tabla: cada línea es fila o continuación
+_CONTINUED = "continued"      # la tabla quedó abierta al cortar la página
 
-    for i in range(th_idx + 1, len(lines)):
-        if lines[i].startswith("Date"):
-            header = lines[i]
-            start = i + 1
-            break
 
-    if start is None:
-        return None
+def _account_name(title: str) -> str:
+    return "Savings" if "savings" in title.lower() else "Checking"
 
-    end = len(lines)
-    for i in range(start, len(lines)):
-        if lines[i].startswith("Totals") or lines[i].startswith("Ending balance on"):
-            end = i
-            break
 
-    return start, end, header
+def _is_table_end(line: str) -> bool:
+    return line.startswith("Totals") or line.startswith("Ending balance on")
 
 
-def segment_transaction_history(pdf_path: str) -> List[TableSection]:
+def _record_balance(acc: Optional[AccountSection], line: str) -> None:
+    if acc is None:
+        return
+    m = _BALANCE_RE.match(line)
+    if not m:
+        return
+    value = float(m.group(4).replace(",", ""))
+    if m.group(2) or m.group(3):
+        value = -value
+    if m.group(1) == "Beginning" and acc.begin_balance is None:
+        acc.begin_balance = value
+    elif m.group(1) == "Ending" and acc.end_balance is None:
+        acc.end_balance = value
+
+
+def segment_pages(pages: Iterable[Tuple[int, List[Line]]]) -> List[AccountSection]:
     """
-    Extrae secciones de tabla para 'Transaction history' por página.
-    En Wells Fargo, puede continuar en varias páginas; lo manejaremos después en el driver.
+    Máquina de estados de una sola pasada sobre las líneas de todas las páginas.
+
+    - "Statement period activity summary" abre una cuenta nueva (nombre = línea anterior,
+      last4 = "Account number: ...") y cierra la anterior.
+    - "Transaction history" + header "Date ..." abre la tabla de la cuenta actual.
+    - "Totals" / "Ending balance on" cierran la tabla.
+    - "Beginning/Ending balance on ..." se guardan en la cuenta actual para conciliar.
+    - Si la página termina con la tabla abierta, en la siguiente se saltan las líneas de
+      encabezado (fecha/página, "Transaction history (continued)", header de columnas)
+      y las filas se siguen agregando a la misma cuenta.
+
+    Devuelve una sección por cuenta, con todas sus filas contiguas. Si las líneas son
+    PageLine, cada sección guarda además la franja vertical de sus filas en cada página
+    (dos cuentas pueden compartir una página).
     """
-    sections: List[TableSection] = []
+    by_key: Dict[Tuple[str, Optional[str]], AccountSection] = {}
+    order: List[AccountSection] = []
+
+    current: Optional[AccountSection] = None
+    state = _OUTSIDE
+
+    def add_row(line: str, pidx: int, pos: Optional[Tuple[float, float]]) -> None:
+        current.lines.append(line)
+        if not current.page_indexes or current.page_indexes[-1] != pidx:
+            current.page_indexes.append(pidx)
+        if pos is not None:
+            top, bottom = current.page_bounds.get(pidx, pos)
+            current.page_bounds[pidx] = (min(top, pos[0]), max(bottom, pos[1]))
+
+    def open_account(name: str, last4: Optional[str]) -> AccountSection:
+        key = (name, last4)
+        acc = by_key.get(key)
+        if acc is None:
+            acc = AccountSection(name=name, last4=last4, header_line=None)
+            by_key[key] = acc
+            order.append(acc)
+        return acc
+
+    for pidx, lines in pages:
+        if state == _TABLE:
+            state = _CONTINUED
+
+        prev = ""
+        for raw in lines:
+            if isinstance(raw, PageLine):
+                line, pos = raw.text.strip(), (raw.top, raw.bottom)
+            else:
+                line, pos = raw.strip(), None
+            if not line:
+                continue
+
+            _record_balance(current, line)
+
+            if line.startswith(ACCOUNT_SUMMARY):
+                m = _ACCOUNT_NUMBER_RE.search(line)
+                last4 = m.group(1)[-4:] if m else None
+                current = open_account(_account_name(prev), last4)
+                state = _OUTSIDE
 
-    with pdfplumber.open(pdf_path) as pdf:
+            elif state == _TABLE:
+                if _is_table_end(line):
+                    state = _OUTSIDE
+                else:
+                    add_row(line, pidx, pos)
+
+            elif state == _CONTINUED:
+                if _is_table_end(line):
+                    state = _OUTSIDE
+                elif line.startswith("Date"):
+                    state = _TABLE
+                elif _ROW_RE.match(line):
+                    state = _TABLE
+                    add_row(line, pidx, pos)
+                # el resto (encabezado de página, "(continued)", títulos de columnas) se ignora
+
+            elif line.startswith(TRANSACTION_HISTORY):
+                if current is None:
+                    # sin resumen de cuenta previo: cuenta por defecto
+                    current = open_account("Checking", None)
+                state = _HISTORY
+
+            elif state == _HISTORY and line.startswith("Date"):
+                if current.header_line is None:
+                    current.header_line = line
+                state = _TABLE
+
+            prev = line
+
+    return [acc for acc in order if acc.header_line is not None or acc.lines]
+
+
+def _iter_page_lines(source: PdfSource, meter: BudgetMeter) -> Iterator[Tuple[int, List[PageLine]]]:
+    with open_pdf(source) as pdf:
         for pidx, page in enumerate(pdf.pages):
-            text = page.extract_text() or ""
-            lines = text.splitlines()
-            found = _find_section_block(lines)
-            if not found:
+            # mismas líneas que extract_text(), con su posición vertical
+            lines = meter.run_page(pidx, page, page.extract_text_lines)
+            if lines is None:
+                # página fuera de presupuesto (queda registrada en meter.errors)
                 continue
+            PAGES.inc()
+            yield pidx, [PageLine(x["text"], x["top"], x["bottom"]) for x in lines]
+
 
-            start, end, header = found
-            context_start = max(0, start - 40)
-            context = lines[context_start:start]
-
-            section_lines = lines[start:end]
-            sections.append(
-                TableSection(
-                    page_index=pidx,
-                    context_lines=context,
-                    header_line=header,
-                    lines=section_lines,
-                )
-            )
-
-    return sections
+def segment_transaction_history(source: PdfSource, meter: Optional[BudgetMeter] = None) -> List[AccountSection]:
+    """
+    Extrae las filas de 'Transaction history' agrupadas por cuenta, recorriendo el PDF una sola vez.
+    Las tablas que continúan en varias páginas quedan unidas en una misma sección.
+    """
+    return segment_pages(_iter_page_lines(source, meter or Budget().start()))
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Union
+
+import pdfplumber
+from pdfplumber.pdf import PDF
+
+
+PdfSource = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, mmap.mmap, BinaryIO, PDF]
+
+
+class MemoryReader(io.RawIOBase):
+    """
+    Stream de solo lectura sobre un buffer (bytes, memoryview, mmap) sin copiarlo.
+    Cada lector tiene su propia posición, así varios hilos pueden leer el mismo buffer.
+    """
+
+    def __init__(self, buf: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        super().__init__()
+        self._view = memoryview(buf).cast("B")
+        self._pos = 0
+
+    @property
+    def view(self) -> memoryview:
+        return self._view
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"whence inválido: {whence}")
+        if pos < 0:
+            raise ValueError("posición negativa")
+        self._pos = pos
+        return pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        if self._pos >= end:
+            return b""
+        chunk = self._view[self._pos : end].tobytes()
+        self._pos = end
+        return chunk
+
+    def readinto(self, b) -> int:
+        chunk = self.read(len(b))
+        n = len(chunk)
+        b[:n] = chunk
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+@contextmanager
+def open_pdf(source: PdfSource) -> Iterator[PDF]:
+    """
+    Abre cualquier fuente soportada como pdfplumber.PDF.
+
+    - Un PDF ya abierto se devuelve tal cual (no se cierra al salir): así las etapas
+      del pipeline comparten un solo parseo del documento.
+    - Rutas se abren desde disco; bytes / memoryview / mmap se leen en memoria sin copiar
+      el buffer; cualquier otro objeto con read()/seek() se usa directo.
+    """
+    if isinstance(source, PDF):
+        yield source
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        with pdfplumber.open(os.fspath(source)) as pdf:
+            yield pdf
+        return
+
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        reader = MemoryReader(source)
+        try:
+            with pdfplumber.open(reader) as pdf:
+                yield pdf
+        finally:
+            reader.close()
+        return
+
+    if hasattr(source, "read") and hasattr(source, "seek"):
+        source.seek(0)
+        with pdfplumber.open(source) as pdf:
+            yield pdf
+        return
+
+    raise TypeError(f"Fuente de PDF no soportada: {type(source).__name__}")
+
+
+def content_hash(pdf: PDF) -> str:
+    """
+    Hash del contenido del PDF abierto (para memoizar por documento, no por ruta).
+    Los buffers en memoria se hashean sin copiar; los streams se leen por bloques
+    y se restaura la posición.
+    """
+    stream = pdf.stream
+    if isinstance(stream, MemoryReader):
+        return hashlib.blake2b(stream.view, digest_size=16).hexdigest()
+
+    h = hashlib.blake2b(digest_size=16)
+    pos = stream.tell()
+    try:
+        stream.seek(0)
+        while True:
+            chunk = stream.read(1 << 20)
+            if not chunk:
+                break
+            h.update(chunk)
+    finally:
+        stream.seek(pos)
+    return h.hexdigest()
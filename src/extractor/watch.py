@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from rich.console import Console
+
+from .banks.wells_fargo import STRATEGIES
+from .budget import PAGE_CODES, Budget, add_budget_arguments, budget_from_args
+from .core import Extractor
+from .metrics import QUEUE_DEPTH, REGISTRY, STAGE_SECONDS, start_http_server
+from .serialize import EXTENSIONS, FORMATS, write_result
+
+
+LEDGER_NAME = "ledger.jsonl"
+
+
+@dataclass
+class _Candidate:
+    size: int
+    mtime_ns: int
+    stable_since: float
+
+
+def file_key(path: Path, st: os.stat_result) -> str:
+    """
+    Identidad de un archivo para el ledger: nombre + tamaño + mtime.
+    Si el archivo se reemplaza por otro contenido, cambia la clave y se reprocesa.
+    """
+    return f"{path.name}:{st.st_size}:{st.st_mtime_ns}"
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[IO[bytes]]:
+    """
+    Escribe a un temporal en el mismo directorio y luego os.replace():
+    quien lea la carpeta de salida nunca ve un archivo a medio escribir.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class Ledger:
+    """
+    Registro append-only (JSONL) de archivos procesados / fallidos.
+    Una línea por archivo terminado; al reiniciar el daemon se recarga para no repetir trabajo.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._keys: Set[str] = set()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self._keys.add(json.loads(line)["key"])
+                except (ValueError, KeyError):
+                    # línea truncada por un corte abrupto: se ignora
+                    continue
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def record(self, key: str, file: str, status: str, output: Optional[str] = None, error: Optional[str] = None) -> None:
+        entry = {
+            "key": key,
+            "file": file,
+            "status": status,
+            "output": output,
+            "error": error,
+            "at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._keys.add(key)
+
+
+_EXTRACTOR: Optional[Extractor] = None
+
+
+def _init_worker(budget: Optional[Budget], strategy: str) -> None:
+    """
+    Construye el Extractor una sola vez por proceso (worker "tibio"):
+    pdfplumber, parsers y reglas quedan cargados para todos los archivos.
+    """
+    global _EXTRACTOR
+    # con fork el worker hereda los contadores del padre: se descartan para no contarlos dos veces
+    REGISTRY.drain()
+    _EXTRACTOR = Extractor(budget=budget, strategy=strategy)
+
+
+def _extract_to_file(pdf_path: str, out_path: str, fmt: str) -> Tuple[int, Optional[str], bool, Dict[str, object]]:
+    """
+    Devuelve (transacciones, error, salida escrita, métricas del worker).
+    Si el documento excedió su presupuesto igual se escribe la salida, con el error
+    estructurado dentro. Las métricas viven en el proceso worker: viajan con cada resultado,
+    también cuando el PDF falla.
+    """
+    extractor = _EXTRACTOR or Extractor()
+    try:
+        result = extractor.extract(pdf_path)
+        with atomic_writer(Path(out_path)) as fh, STAGE_SECONDS.time("serialize"):
+            write_result(result, fh, fmt)
+    except Exception as exc:  # PDF ilegible, etc.: se reporta al ledger
+        return 0, f"{type(exc).__name__}: {exc}", False, REGISTRY.drain()
+
+    fatal = next((e for e in result.errors if e.code not in PAGE_CODES), None)
+    total = sum(len(a.transactions) for a in result.accounts)
+    return total, (f"{fatal.code}: {fatal.message}" if fatal else None), True, REGISTRY.drain()
+
+
+class FolderWatcher:
+    """
+    Vigila una carpeta por polling (os.scandir + stat, sin dependencias externas)
+    y manda cada PDF nuevo a un pool de procesos que ya tiene todo importado.
+
+    Debounce: un archivo se considera completo cuando su tamaño y mtime no cambian
+    durante `settle_seconds`, así no se procesan PDFs que todavía se están copiando.
+    """
+
+    def __init__(
+        self,
+        in_dir: Path,
+        out_dir: Path,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        settle_seconds: float = 2.0,
+        fmt: str = "json",
+        budget: Optional[Budget] = None,
+        strategy: str = "auto",
+        metrics_file: Optional[Path] = None,
+        max_tasks_per_child: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        console: Optional[Console] = None,
+    ):
+        self.in_dir = Path(in_dir)
+        self.out_dir = Path(out_dir)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.fmt = fmt
+        self.budget = budget
+        self.strategy = strategy
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.max_tasks_per_child = max_tasks_per_child
+        self.clock = clock
+        self.console = console or Console(stderr=True)
+
+        self.ledger = Ledger(self.out_dir / LEDGER_NAME)
+        self._candidates: Dict[Path, _Candidate] = {}
+        # (key, pdf, salida, aislado)
+        self._in_flight: Dict[Future, Tuple[str, Path, Path, bool]] = {}
+        self._in_flight_keys: Set[str] = set()
+        # (key, pdf, sospechoso): listos pero todavía no enviados al pool
+        self._pending: "deque[Tuple[str, Path, bool]]" = deque()
+        self._pending_keys: Set[str] = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._broken = False
+
+    # --- descubrimiento ---
+
+    def scan(self) -> List[Tuple[str, Path]]:
+        """
+        Devuelve (key, path) de los PDFs listos para procesar en este tick.
+        """
+        now = self.clock()
+        ready: List[Tuple[str, Path]] = []
+        seen: Set[Path] = set()
+
+        try:
+            entries = list(os.scandir(self.in_dir))
+        except FileNotFoundError:
+            return ready
+
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.lower().endswith(".pdf"):
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            path = Path(entry.path)
+            seen.add(path)
+            key = file_key(path, st)
+            if key in self.ledger or key in self._in_flight_keys or key in self._pending_keys:
+                continue
+
+            cand = self._candidates.get(path)
+            if cand is None or cand.size != st.st_size or cand.mtime_ns != st.st_mtime_ns:
+                # nuevo o todavía creciendo: reiniciar la espera
+                self._candidates[path] = _Candidate(st.st_size, st.st_mtime_ns, now)
+                continue
+
+            if now - cand.stable_since >= self.settle_seconds and st.st_size > 0:
+                del self._candidates[path]
+                ready.append((key, path))
+
+        # olvidar archivos que desaparecieron de la carpeta
+        for path in list(self._candidates):
+            if path not in seen:
+                del self._candidates[path]
+
+        return ready
+
+    # --- ejecución ---
+
+    def _output_path(self, pdf_path: Path) -> Path:
+        return self.out_dir / f"{pdf_path.stem}{EXTENSIONS[self.fmt]}"
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        kwargs = {}
+        if self.max_tasks_per_child:
+            kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self.budget, self.strategy), **kwargs
+        )
+
+    def _restart_pool(self) -> None:
+        self.console.print("Un worker murió: reiniciando el pool", style="bold yellow")
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self._broken = False
+
+    def _submit(self, key: str, pdf_path: Path, isolated: bool = False) -> bool:
+        assert self._pool is not None
+        out_path = self._output_path(pdf_path)
+        try:
+            fut = self._pool.submit(_extract_to_file, str(pdf_path), str(out_path), self.fmt)
+        except BrokenProcessPool:
+            self._broken = True
+            return False
+        self._in_flight[fut] = (key, pdf_path, out_path, isolated)
+        self._in_flight_keys.add(key)
+        QUEUE_DEPTH.set(len(self._in_flight) + len(self._pending))
+        self.console.print(f"En cola: {pdf_path.name}")
+        return True
+
+    def _dispatch(self) -> None:
+        """
+        Manda al pool lo pendiente. Los sospechosos de haber tirado un worker corren
+        de a uno (sin nada más en vuelo): si el pool se rompe de nuevo, el culpable es ese.
+        """
+        while self._pending and not self._broken:
+            key, path, suspect = self._pending[0]
+            if suspect and self._in_flight:
+                break
+            if any(isolated for *_, isolated in self._in_flight.values()):
+                break
+            if not self._submit(key, path, isolated=suspect):
+                break
+            self._pending.popleft()
+            self._pending_keys.discard(key)
+            if suspect:
+                break
+        QUEUE_DEPTH.set(len(self._in_flight) + len(self._pending))
+
+    def _collect(self, block: bool = False) -> int:
+        done = [f for f in self._in_flight if block or f.done()]
+        crashed: List[Tuple[str, Path]] = []
+        for fut in done:
+            key, pdf_path, out_path, isolated = self._in_flight.pop(fut)
+            self._in_flight_keys.discard(key)
+            try:
+                total, error, wrote, worker_metrics = fut.result()
+            except BrokenProcessPool:
+                self._broken = True
+                if not isolated:
+                    # no se sabe qué archivo tiró el worker: se reintenta aislado
+                    crashed.append((key, pdf_path))
+                    continue
+                total, error, wrote = 0, "WorkerCrashed: el proceso worker murió con este archivo", False
+            except Exception as exc:
+                total, error, wrote = 0, f"{type(exc).__name__}: {exc}", False
+            else:
+                REGISTRY.merge(worker_metrics)
+
+            if error:
+                self.ledger.record(key, pdf_path.name, "failed", output=out_path.name if wrote else None, error=error)
+                self.console.print(f"ERROR {pdf_path.name}: {error}", style="bold red")
+            else:
+                self.ledger.record(key, pdf_path.name, "processed", output=out_path.name)
+                self.console.print(f"OK {pdf_path.name} -> {out_path.name} ({total} transacciones)", style="bold green")
+
+        for key, pdf_path in reversed(crashed):
+            self._pending.appendleft((key, pdf_path, True))
+            self._pending_keys.add(key)
+        QUEUE_DEPTH.set(len(self._in_flight) + len(self._pending))
+        return len(done) - len(crashed)
+
+    def poll_once(self) -> int:
+        """
+        Un tick del loop: recoge resultados terminados y encola los archivos listos.
+        Si un worker murió (OOM, segfault) el pool se reconstruye y el daemon sigue.
+        """
+        finished = self._collect()
+        if self._broken and not self._in_flight:
+            self._restart_pool()
+        ready = self.scan()
+        for key, path in ready:
+            self._pending.append((key, path, False))
+            self._pending_keys.add(key)
+        self._dispatch()
+        if self.metrics_file and (finished or ready):
+            REGISTRY.write_textfile(self.metrics_file)
+        return finished
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._in_flight or self._pending)
+
+    def __enter__(self) -> "FolderWatcher":
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._pool = self._new_pool()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pool is not None:
+            self._collect(block=True)
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            if self.metrics_file:
+                REGISTRY.write_textfile(self.metrics_file)
+
+    def run(self, max_ticks: Optional[int] = None) -> None:
+        ticks = 0
+        while max_ticks is None or ticks < max_ticks:
+            self.poll_once()
+            ticks += 1
+            time.sleep(self.poll_interval)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bank Statement Extractor - modo daemon (watch folder)")
+    parser.add_argument("folder", help="Carpeta donde llegan los PDFs")
+    parser.add_argument("--out", default="", help="Carpeta de salida (default: <folder>/processed)")
+    parser.add_argument("--format", default="json", choices=FORMATS, help="Formato de salida (default: json)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1), help="Procesos del pool")
+    parser.add_argument("--interval", type=float, default=1.0, help="Segundos entre escaneos")
+    parser.add_argument("--settle", type=float, default=2.0, help="Segundos sin cambios para considerar un PDF completo")
+    parser.add_argument("--strategy", default="auto", choices=STRATEGIES, help="Parser: auto / text / layout")
+    parser.add_argument(
+        "--max-tasks-per-child", type=int, default=None,
+        help="Reciclar cada worker después de N archivos (libera memoria retenida)",
+    )
+    parser.add_argument("--metrics-port", type=int, default=None, help="Publicar /metrics (Prometheus) en este puerto local")
+    parser.add_argument("--metrics-file", default="", help="Escribir métricas (Prometheus) en este archivo")
+    add_budget_arguments(parser)
+    args = parser.parse_args()
+
+    in_dir = Path(args.folder)
+    if not in_dir.is_dir():
+        raise SystemExit(f"No existe la carpeta: {in_dir}")
+    out_dir = Path(args.out) if args.out else in_dir / "processed"
+
+    console = Console(stderr=True)
+    console.print(f"Vigilando: {in_dir} -> {out_dir}", style="bold")
+    if args.metrics_port is not None:
+        start_http_server(args.metrics_port)
+        console.print(f"Métricas: http://127.0.0.1:{args.metrics_port}/metrics")
+
+    watcher = FolderWatcher(
+        in_dir,
+        out_dir,
+        workers=args.workers,
+        poll_interval=args.interval,
+        settle_seconds=args.settle,
+        fmt=args.format,
+        budget=budget_from_args(args),
+        strategy=args.strategy,
+        metrics_file=Path(args.metrics_file) if args.metrics_file else None,
+        max_tasks_per_child=args.max_tasks_per_child,
+        console=console,
+    )
+    try:
+        with watcher:
+            watcher.run()
+    except KeyboardInterrupt:
+        console.print("Detenido.", style="bold")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from extractor.analysis import INFLOW, OUTFLOW, StatementTable  # noqa: E402
+from extractor.models import Account, ExtractionResult, Transaction  # noqa: E402
+
+
+def _result(txs_checking, txs_savings=()):
+    return ExtractionResult(
+        bank="Wells Fargo",
+        accounts=[
+            Account(name="Checking", last4="2714", transactions=[Transaction(**t) for t in txs_checking]),
+            Account(name="Savings", last4="4797", transactions=[Transaction(**t) for t in txs_savings]),
+        ],
+    )
+
+
+@pytest.fixture
+def table():
+    march = _result(
+        [
+            dict(date="2024-03-12", description="eDeposit", amount=50.0, balance=50.0),
+            dict(date="2024-03-20", description="Purchase Wal-Mart", amount=-40.0, balance=10.0),
+            dict(date="2024-03-20", description="Transfer Debit", amount=-1.0, balance=None),
+        ],
+        [dict(date="2024-03-20", description="Transfer Credit", amount=1.0, balance=51.0)],
+    )
+    april = _result(
+        [
+            dict(date="2024-04-02", description="eDeposit", amount=650.0, balance=659.0),
+            dict(date="2024-04-02", description="Zelle to Rent", amount=-650.0, balance=9.0),
+            dict(date="2024-04-04", description="Purchase Kroger", amount=-25.46, balance=None),
+        ],
+    )
+    return StatementTable.from_results([march, april])
+
+
+def test_columns(table):
+    assert len(table) == 7
+    assert table.accounts == [("Wells Fargo", "Checking", "2714"), ("Wells Fargo", "Savings", "4797")]
+    assert table.cents.dtype == np.int64
+    assert table.cents.tolist() == [5000, -4000, -100, 100, 65000, -65000, -2546]
+    assert table.direction.tolist() == [1, -1, -1, 1, 1, -1, -1]
+    assert table.account.tolist() == [0, 0, 0, 1, 0, 0, 0]
+    assert table.has_balance.tolist() == [True, True, False, True, True, True, False]
+
+
+def test_monthly_totals(table):
+    rows = {(r.account[1], r.month): r for r in table.monthly_totals()}
+    assert set(rows) == {("Checking", "2024-03"), ("Checking", "2024-04"), ("Savings", "2024-03")}
+
+    mar = rows[("Checking", "2024-03")]
+    assert (mar.inflow, mar.outflow, mar.net, mar.count) == (50.0, 41.0, 9.0, 3)
+    apr = rows[("Checking", "2024-04")]
+    assert (apr.inflow, apr.outflow, apr.net, apr.count) == (650.0, 675.46, -25.46, 3)
+
+
+def test_average_balances(table):
+    rows = {(r.account[1], r.month): (r.average, r.samples) for r in table.average_balances()}
+    assert rows == {
+        ("Checking", "2024-03"): (30.0, 2),
+        ("Checking", "2024-04"): (334.0, 2),
+        ("Savings", "2024-03"): (51.0, 1),
+    }
+
+
+def test_largest_per_account(table):
+    rows = table.largest(2)
+    assert [(r.account[1], r.amount) for r in rows] == [
+        ("Checking", 650.0),
+        ("Checking", -650.0),
+        ("Savings", 1.0),
+    ]
+
+
+def test_where(table):
+    outflows = table.where(direction=OUTFLOW, min_amount=10)
+    assert outflows.cents.tolist() == [-4000, -65000, -2546]
+
+    april = table.where(start=datetime.date(2024, 4, 1), end=datetime.date(2024, 4, 2))
+    assert april.cents.tolist() == [65000, -65000]
+
+    savings = table.where(accounts=table.account_ids(name="savings"), direction=INFLOW)
+    assert savings.cents.tolist() == [100]
+
+    assert len(table.where(max_amount=0.5)) == 0
+    assert table.where(max_amount=0.5).monthly_totals() == []
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+from extractor.banks.wells_fargo import extract
+from extractor.banks.wells_fargo_layout import extract_transactions_layout
+from extractor.budget import Budget, BudgetExceeded
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+def test_pages_over_object_budget_are_skipped_and_reported():
+    # la página 5 (disclosures) es la única con más de 4000 objetos
+    result = extract(str(SAMPLE_PDF), budget=Budget(max_page_objects=4000))
+
+    assert sum(len(a.transactions) for a in result.accounts) == 17
+    assert [(e.code, e.page) for e in result.errors] == [("page_objects", 4)]
+
+
+def test_document_timeout_returns_structured_error():
+    result = extract(str(SAMPLE_PDF), budget=Budget(timeout_s=0.001))
+
+    assert result.accounts == []
+    assert result.errors[-1].code == "timeout"
+
+
+def test_page_timeout_interrupts_slow_page():
+    meter = Budget(page_timeout_s=0.05).start()
+    started = time.monotonic()
+    out = meter.run_page(0, _FakePage(), lambda: time.sleep(5))
+    assert out is None
+    assert time.monotonic() - started < 2
+    assert [e.code for e in meter.errors] == ["page_timeout"]
+
+
+def test_layout_parser_refuses_pages_over_char_budget():
+    meter = Budget(max_layout_chars=100).start()
+    with pytest.raises(BudgetExceeded) as exc:
+        extract_transactions_layout(str(SAMPLE_PDF), [1], 2024, meter=meter)
+    assert exc.value.code == "layout_chars"
+    assert exc.value.page == 1
+
+
+class _FakePage:
+    objects: dict = {}
+
+
+def test_memory_limit_is_per_document_growth(monkeypatch):
+    import extractor.budget as budget_mod
+
+    rss = {"mb": 300.0}
+
+    def _growing() -> float:
+        rss["mb"] += 60.0    # el primer documento retiene memoria en cada página
+        return rss["mb"]
+
+    monkeypatch.setattr(budget_mod, "_rss_mb", _growing)
+    first = extract(str(SAMPLE_PDF), budget=Budget(max_memory_mb=100))
+    assert first.errors[-1].code == "memory"
+
+    # el worker quedó con RSS alto, pero el siguiente documento no crece: debe pasar
+    monkeypatch.setattr(budget_mod, "_rss_mb", lambda: rss["mb"])
+    second = extract(str(SAMPLE_PDF), budget=Budget(max_memory_mb=100))
+    assert second.errors == []
+    assert sum(len(a.transactions) for a in second.accounts) == 17
+
+
+def test_page_timeout_inside_pdfplumber_skips_the_page():
+    import pdfplumber
+
+    # la alarma salta dentro de page.layout, que la re-lanza como PdfminerException
+    meter = Budget(page_timeout_s=0.001).start()
+    with pdfplumber.open(str(SAMPLE_PDF)) as pdf:
+        page = pdf.pages[4]
+        out = meter.run_page(4, page, page.extract_text_lines)
+
+    assert out is None
+    assert [(e.code, e.page) for e in meter.errors] == [("page_timeout", 4)]
+
+
+def test_document_timeout_inside_pdfplumber_propagates_budget_error():
+    import pdfplumber
+
+    meter = Budget(timeout_s=60).start()
+    with pdfplumber.open(str(SAMPLE_PDF)) as pdf:
+        page = pdf.pages[4]
+        # el chequeo previo pasa; el plazo vence con la alarma ya armada, dentro de pdfplumber
+        meter.deadline = time.monotonic() + 0.005
+        with pytest.raises(BudgetExceeded) as exc:
+            meter.run_page(4, page, page.extract_text_lines)
+
+    assert (exc.value.code, exc.value.page) == ("timeout", 4)
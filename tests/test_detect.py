@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import datetime
+from pathlib import Path
+
+from extractor.budget import Budget
+from extractor.detect import _body_period, clear_detect_cache, detect_cache_info, detect_pdf, parse_statement_period
+from extractor.parse import parse_transactions_from_lines, resolve_date
+from extractor.source import open_pdf
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+def test_sample_header_detection():
+    clear_detect_cache()
+    info = detect_pdf(str(SAMPLE_PDF))
+
+    assert info.is_digital_pdf
+    assert info.pages == 5
+    assert info.statement_year == 2024
+    assert info.period_end == datetime.date(2024, 4, 5)
+
+
+def test_detection_is_memoized_by_content():
+    clear_detect_cache()
+    data = SAMPLE_PDF.read_bytes()
+
+    first = detect_pdf(str(SAMPLE_PDF))
+    second = detect_pdf(data)   # otra fuente, mismo contenido
+
+    assert second is first
+    assert detect_cache_info() == (1, 1)
+
+
+def test_parse_statement_period_formats():
+    d = datetime.date
+    assert parse_statement_period("Statement period 12/06/2024 - 01/05/2025") == (d(2024, 12, 6), d(2025, 1, 5))
+    assert parse_statement_period("Statement Period: December 6, 2024 through January 5, 2025") == (
+        d(2024, 12, 6),
+        d(2025, 1, 5),
+    )
+    assert parse_statement_period("April 5, 2024 Page 1 of 5") == (None, d(2024, 4, 5))
+    assert parse_statement_period("Questions? Call 1-800-869-3557") == (None, None)
+
+
+def test_december_rows_on_january_statement():
+    period_end = datetime.date(2025, 1, 5)
+    assert resolve_date(12, 28, 2025, period_end) == datetime.date(2024, 12, 28)
+    assert resolve_date(1, 3, 2025, period_end) == datetime.date(2025, 1, 3)
+    assert resolve_date(2, 29, 2025, datetime.date(2024, 3, 5)) == datetime.date(2024, 2, 29)
+    # sin cierre conocido se mantiene el comportamiento anterior
+    assert resolve_date(12, 28, 2025) == datetime.date(2025, 12, 28)
+
+    txs = parse_transactions_from_lines(
+        ["12/30 Purchase Kroger 25.46 100.00", "1/2 eDeposit IN Branch 50.00 150.00"],
+        statement_year=2025,
+        period_end=period_end,
+    )
+    assert [t.date for t in txs] == ["2024-12-30", "2025-01-02"]
+
+
+def test_year_from_body_before_pdf_metadata(monkeypatch):
+    import extractor.detect as detect
+
+    # la metadata del sample es de la descarga (2025), no del statement (2024)
+    with open_pdf(str(SAMPLE_PDF)) as pdf:
+        assert detect._metadata_year(pdf.metadata) == 2025
+
+    monkeypatch.setattr(detect, "HEADER_FRACTION", 0.001)   # encabezado sin fecha
+    clear_detect_cache()
+    try:
+        info = detect_pdf(str(SAMPLE_PDF))
+    finally:
+        clear_detect_cache()
+    assert info.statement_year == 2024
+    assert info.period_end == datetime.date(2024, 4, 5)
+
+
+def test_body_period_sources():
+    d = datetime.date
+    fee = ["Beginning balance on 3/12 $0.00", "Fee period 03/12/2024 - 04/05/2024 Standard monthly service fee $5.00"]
+    assert _body_period(["\n".join(fee)]) == (d(2024, 3, 12), d(2024, 4, 5), 2024)
+    assert _body_period(["3/12 eDeposit IN Branch 03/12/24 12:00:56 PM 50.00", "4/2 eDeposit 04/02/24"]) == (
+        None,
+        None,
+        2024,
+    )
+    assert _body_period(["Beginning balance on 3/12 $0.00"]) == (None, None, None)
+
+
+def test_body_range_beats_disclosure_dates():
+    d = datetime.date
+    texts = ["Effective March 1, 2024 the following terms apply", "Fee period 03/12/2024 - 04/05/2024"]
+    assert _body_period(texts) == (d(2024, 3, 12), d(2024, 4, 5), 2024)
+    # sin rango, una fecha suelta solo da el año; nunca el cierre del periodo
+    assert _body_period(["Effective March 1, 2024 the following terms apply"]) == (None, None, 2024)
+
+
+def test_digital_check_runs_under_page_budget():
+    # una página con demasiados objetos no se parsea fuera del presupuesto en la detección
+    clear_detect_cache()
+    meter = Budget(max_page_objects=10).start()
+    try:
+        info = detect_pdf(str(SAMPLE_PDF), meter)
+    finally:
+        clear_detect_cache()
+    assert not info.is_digital_pdf
+    assert {e.code for e in meter.errors} == {"page_objects"}
+    assert {e.page for e in meter.errors} >= {0, 1, 2}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import io
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from extractor.core import Extractor
+from extractor.normalize import SignRules, apply_sign_heuristics
+from extractor.models import Transaction
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+@pytest.fixture(scope="module")
+def extractor() -> Extractor:
+    return Extractor()
+
+
+@pytest.fixture(scope="module")
+def expected(extractor):
+    return extractor.extract(str(SAMPLE_PDF))
+
+
+def test_in_memory_sources_match_path(extractor, expected):
+    data = SAMPLE_PDF.read_bytes()
+
+    assert extractor.extract(SAMPLE_PDF) == expected
+    assert extractor.extract(data) == expected
+    assert extractor.extract(memoryview(data)) == expected
+    assert extractor.extract(io.BytesIO(data)) == expected
+
+    with SAMPLE_PDF.open("rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            assert extractor.extract(mm) == expected
+        finally:
+            mm.close()  # no deben quedar vistas exportadas
+
+
+def test_shared_extractor_across_threads(extractor, expected):
+    data = SAMPLE_PDF.read_bytes()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(extractor.extract, [data] * 8))
+    assert all(r == expected for r in results)
+
+
+def test_unsupported_source(extractor):
+    with pytest.raises(TypeError):
+        extractor.extract(12345)
+
+
+def test_custom_sign_rules():
+    rules = SignRules(inflow=("reembolso",), outflow=("compra",))
+    txs = [
+        Transaction(date="2024-01-01", description="Compra en tienda", amount=10.0),
+        Transaction(date="2024-01-02", description="REEMBOLSO compra", amount=-5.0),
+        Transaction(date="2024-01-03", description="Otro", amount=-3.0),
+    ]
+    assert [t.amount for t in apply_sign_heuristics(txs, rules)] == [-10.0, 5.0, -3.0]
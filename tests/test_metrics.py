@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import urllib.request
+from pathlib import Path
+
+from extractor.core import Extractor
+from extractor.detect import clear_detect_cache
+from extractor.metrics import CACHE_REQUESTS, DOCUMENTS, PAGES, REGISTRY, ROWS, STAGE_SECONDS, Registry
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+def test_prometheus_text_format():
+    reg = Registry()
+    docs = reg.counter("docs_total", "Documentos", ("status",))
+    depth = reg.gauge("queue_depth", "Cola")
+    lat = reg.histogram("stage_seconds", "Latencia", ("stage",), buckets=(0.1, 1.0))
+
+    docs.inc(1, "ok")
+    docs.inc(2, "ok")
+    depth.set(3)
+    lat.observe(0.05, "detect")
+    lat.observe(0.5, "detect")
+    lat.observe(5.0, "detect")
+
+    assert reg.render().splitlines() == [
+        "# HELP docs_total Documentos",
+        "# TYPE docs_total counter",
+        'docs_total{status="ok"} 3',
+        "# HELP queue_depth Cola",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+        "# HELP stage_seconds Latencia",
+        "# TYPE stage_seconds histogram",
+        'stage_seconds_bucket{stage="detect",le="0.1"} 1',
+        'stage_seconds_bucket{stage="detect",le="1"} 2',
+        'stage_seconds_bucket{stage="detect",le="+Inf"} 3',
+        'stage_seconds_sum{stage="detect"} 5.55',
+        'stage_seconds_count{stage="detect"} 3',
+    ]
+
+
+def test_drain_and_merge_between_registries():
+    worker, main = Registry(), Registry()
+    for reg in (worker, main):
+        reg.counter("rows_total", "Filas", ("tier",))
+        reg.histogram("seconds", "Latencia", buckets=(1.0,))
+
+    worker._metrics["rows_total"].inc(17, "text")
+    worker._metrics["seconds"].observe(0.3)
+    snapshot = worker.drain()
+    main.merge(snapshot)
+    main.merge(worker.drain())  # ya vacío: no suma de nuevo
+
+    assert main._metrics["rows_total"].value("text") == 17
+    assert main._metrics["seconds"].count() == 1
+    assert worker._metrics["rows_total"].value("text") == 0
+
+
+def test_pipeline_stages_update_global_registry(tmp_path):
+    ok_before = DOCUMENTS.value("ok")
+    rows_before = ROWS.value("text")
+    pages_before = PAGES.value()
+    detect_before = STAGE_SECONDS.count("detect")
+    hits_before, misses_before = CACHE_REQUESTS.value("detect", "hit"), CACHE_REQUESTS.value("detect", "miss")
+
+    clear_detect_cache()
+    extractor = Extractor()
+    extractor.extract(str(SAMPLE_PDF))   # miss
+    extractor.extract(str(SAMPLE_PDF))   # hit
+
+    assert DOCUMENTS.value("ok") == ok_before + 2
+    assert ROWS.value("text") == rows_before + 34
+    assert PAGES.value() == pages_before + 10
+    assert STAGE_SECONDS.count("detect") == detect_before + 2
+    assert CACHE_REQUESTS.value("detect", "miss") == misses_before + 1
+    assert CACHE_REQUESTS.value("detect", "hit") == hits_before + 1
+
+    out = tmp_path / "metrics.prom"
+    REGISTRY.write_textfile(out)
+    text = out.read_text(encoding="utf-8")
+    assert 'extractor_documents_total{status="ok"}' in text
+    assert 'extractor_cache_requests_total{cache="detect",result="hit"}' in text
+
+
+def test_http_endpoint():
+    reg = Registry()
+    reg.counter("up_total", "Prueba").inc()
+    server = reg.serve(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain")
+    finally:
+        server.shutdown()
+    assert "up_total 1" in body
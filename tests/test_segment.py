@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from extractor.parse import parse_transactions_from_lines
+from extractor.reconcile import reconciles
+from extractor.segment import PageLine, segment_pages
+
+
+PAGES = [
+    # cuenta checking: la tabla queda abierta al final de la página
+    [
+        "April 5, 2024 Page 2 of 6",
+        "Wells Fargo Clear Access Banking SM",
+        "Statement period activity summary Account number: 5786362714",
+        "Beginning balance on 3/12 $0.00",
+        "Transaction history",
+        "Check Deposits/ Withdrawals/ Ending daily",
+        "Date Number Description Additions Subtractions balance",
+        "3/12 eDeposit IN Branch 50.00 50.00",
+        "Duluth GA 1230",
+        "3/20 Purchase authorized on 03/20 40.00",
+    ],
+    # continuación: encabezado de página + header de columnas repetido
+    [
+        "April 5, 2024 Page 3 of 6",
+        "Transaction history (continued)",
+        "Check Deposits/ Withdrawals/ Ending daily",
+        "Date Number Description Additions Subtractions balance",
+        "GA P000000286325539 Card 1230",
+        "3/21 Zelle From Someone 20.00 30.00",
+        "Ending balance on 4/5 30.00",
+        "Totals $70.00 $40.00",
+    ],
+    # página sin tabla
+    [
+        "April 5, 2024 Page 4 of 6",
+        "Monthly service fee summary",
+    ],
+    # cuenta savings
+    [
+        "April 5, 2024 Page 5 of 6",
+        "Wells Fargo Way2Save® Savings",
+        "Statement period activity summary Account number: 5280584797",
+        "Transaction history",
+        "Date Description Additions Subtractions balance",
+        "4/5 Save As You Go Transfer Credit 1.00 52.00",
+    ],
+    # continuación sin header de columnas: la fila aparece directo
+    [
+        "April 5, 2024 Page 6 of 6",
+        "4/6 Interest Payment 0.01 52.01",
+        "Ending balance on 4/6 52.01",
+    ],
+]
+
+
+def test_tables_continue_across_pages_as_one_account():
+    sections = segment_pages(enumerate(PAGES))
+
+    assert [(s.name, s.last4) for s in sections] == [("Checking", "2714"), ("Savings", "4797")]
+
+    checking, savings = sections
+    assert checking.header_line.startswith("Date Number")
+    assert checking.page_indexes == [0, 1]
+    assert (checking.begin_balance, checking.end_balance) == (0.0, 30.0)
+    assert checking.lines == [
+        "3/12 eDeposit IN Branch 50.00 50.00",
+        "Duluth GA 1230",
+        "3/20 Purchase authorized on 03/20 40.00",
+        "GA P000000286325539 Card 1230",
+        "3/21 Zelle From Someone 20.00 30.00",
+    ]
+
+    assert savings.page_indexes == [3, 4]
+    assert (savings.begin_balance, savings.end_balance) == (None, 52.01)
+    assert savings.lines == [
+        "4/5 Save As You Go Transfer Credit 1.00 52.00",
+        "4/6 Interest Payment 0.01 52.01",
+    ]
+
+
+def test_history_without_account_summary_uses_default_account():
+    sections = segment_pages([(0, ["Transaction history", "Date Description Amount", "1/2 Fee 5.00"])])
+    assert [(s.name, s.last4, s.lines) for s in sections] == [("Checking", None, ["1/2 Fee 5.00"])]
+
+
+def test_account_without_rows_is_kept_and_parses_empty():
+    # Savings sin movimientos en el periodo: solo header de columnas y balance final
+    pages = [
+        [
+            "Wells Fargo Way2Save® Savings",
+            "Statement period activity summary Account number: 5280584797",
+            "Beginning balance on 3/12 $52.00",
+            "Transaction history",
+            "Date Description Additions Subtractions balance",
+            "Ending balance on 4/5 52.00",
+        ]
+    ]
+    (savings,) = segment_pages(enumerate(pages))
+
+    assert (savings.name, savings.lines, savings.page_indexes) == ("Savings", [], [])
+    txs = parse_transactions_from_lines(savings.lines, 2024)
+    assert txs == []
+    assert reconciles(txs, savings.begin_balance, savings.end_balance) is True
+
+
+def test_accounts_sharing_a_page_get_their_own_vertical_bounds():
+    page = [
+        PageLine("Wells Fargo Clear Access Banking SM", 90, 98),
+        PageLine("Statement period activity summary Account number: 5786362714", 100, 108),
+        PageLine("Transaction history", 120, 128),
+        PageLine("Date Description Additions Subtractions balance", 130, 138),
+        PageLine("3/12 eDeposit 50.00 50.00", 140, 148),
+        PageLine("Duluth GA 1230", 149, 157),
+        PageLine("Ending balance on 4/5 50.00", 160, 168),
+        PageLine("Wells Fargo Way2Save® Savings", 300, 308),
+        PageLine("Statement period activity summary Account number: 5280584797", 310, 318),
+        PageLine("Transaction history", 320, 328),
+        PageLine("Date Description Additions Subtractions balance", 330, 338),
+        PageLine("4/5 Transfer Credit 1.00 52.00", 340, 348),
+        PageLine("Ending balance on 4/5 52.00", 350, 358),
+    ]
+    checking, savings = segment_pages([(2, page)])
+
+    assert checking.page_bounds == {2: (140, 157)}
+    assert savings.page_bounds == {2: (340, 348)}
+    assert checking.lines == ["3/12 eDeposit 50.00 50.00", "Duluth GA 1230"]
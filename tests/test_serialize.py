@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from extractor.models import Account, ExtractionError, ExtractionResult, Transaction
+from extractor.serialize import FORMATS, load_result, write_result
+
+
+def _sample_result() -> ExtractionResult:
+    return ExtractionResult(
+        bank="Wells Fargo",
+        statement_year=2024,
+        accounts=[
+            Account(
+                name="Checking",
+                last4="2714",
+                transactions=[
+                    Transaction(date="2024-03-12", description="eDeposit IN Branch, \"Duluth\" GA", amount=50.0, balance=50.0),
+                    Transaction(date="2024-03-20", description="Purchase Wal-Mart ñandú", amount=-40.0, balance=None),
+                    Transaction(date="2024-03-20", description="Save As You Go\nTransfer", amount=-1.0, balance=9.0),
+                ],
+            ),
+            Account(name="Savings", transactions=[]),
+            Account(
+                name="Savings",
+                last4="4797",
+                transactions=[Transaction(date="2024-04-05", description="Transfer Credit", amount=1.0, balance=52.0)],
+            ),
+        ],
+    )
+
+
+def _edge_result() -> ExtractionResult:
+    # dos cuentas iguales seguidas, descripción vacía, campos opcionales y errores
+    return ExtractionResult(
+        bank="Wells Fargo",
+        statement_year=None,
+        period_end="2024-04-05",
+        accounts=[
+            Account(
+                name="Checking",
+                begin_balance=10.0,
+                end_balance=9.5,
+                tier="layout",
+                reconciled=True,
+                transactions=[Transaction(date="2024-03-12", description="", amount=-0.5, balance=9.5)],
+            ),
+            Account(name="Checking", reconciled=False, transactions=[]),
+            Account(
+                name="Checking",
+                currency="",
+                transactions=[Transaction(date="2024-03-13", description="Fee", amount=-1.0)],
+            ),
+        ],
+        errors=[
+            ExtractionError(code="page_objects", message="Página con 9000 objetos", page=4),
+            ExtractionError(code="timeout", message="Documento excedió 30s"),
+        ],
+    )
+
+
+@pytest.mark.parametrize("make", [_sample_result, _edge_result, lambda: ExtractionResult(bank="Wells Fargo")])
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_round_trip(fmt, make):
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+
+    result = make()
+    buf = io.BytesIO()
+    write_result(result, buf, fmt)
+    buf.seek(0)
+
+    assert load_result(buf, fmt) == result
+
+
+def test_json_matches_model_dump_layout():
+    result = _sample_result()
+    buf = io.BytesIO()
+    write_result(result, buf, "json")
+    expected = json.dumps(result.model_dump(), ensure_ascii=False, indent=2)
+    assert buf.getvalue().decode("utf-8") == expected
+
+
+def test_compact_json_has_no_whitespace_separators():
+    buf = io.BytesIO()
+    write_result(_sample_result(), buf, "json-compact")
+    assert b", " not in buf.getvalue().replace(b"Branch, ", b"")
+    assert b"\n  " not in buf.getvalue()
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        write_result(_sample_result(), io.BytesIO(), "xml")
+
+
+def test_compact_json_without_orjson(monkeypatch):
+    import extractor.serialize as serialize
+
+    monkeypatch.setattr(serialize, "orjson", None)
+    result = _sample_result()
+    buf = io.BytesIO()
+    write_result(result, buf, "json-compact")
+    assert buf.getvalue() == json.dumps(result.model_dump(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def test_json_not_slower_than_model_dump():
+    import time
+
+    # el camino por defecto no debe ser más lento que el json.dumps(model_dump(), indent=2) original
+    txs = [Transaction(date="2024-03-12", description=f"Zelle From Someone {i}", amount=-1.5 * i, balance=10.0 + i) for i in range(5000)]
+    result = ExtractionResult(bank="Wells Fargo", accounts=[Account(name="Checking", last4=str(i), transactions=txs) for i in range(4)])
+
+    def best(fn) -> float:
+        times = []
+        for _ in range(3):
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        return min(times)
+
+    baseline = best(lambda: json.dumps(result.model_dump(), ensure_ascii=False, indent=2).encode("utf-8"))
+    streamed = best(lambda: write_result(result, io.BytesIO(), "json"))
+    assert streamed < baseline
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from extractor.budget import Budget
+from extractor.core import Extractor
+from extractor.normalize import SignRules
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+def _by_name(result):
+    return {a.name: a for a in result.accounts}
+
+
+def test_sample_reconciles_on_text_tier():
+    accounts = _by_name(Extractor().extract(str(SAMPLE_PDF)))
+
+    assert {n: (a.tier, a.reconciled) for n, a in accounts.items()} == {
+        "Checking": ("text", True),
+        "Savings": ("text", True),
+    }
+    assert (accounts["Checking"].begin_balance, accounts["Checking"].end_balance) == (0.0, 312.54)
+    assert (accounts["Savings"].begin_balance, accounts["Savings"].end_balance) == (51.0, 52.0)
+
+
+def test_failed_reconciliation_escalates_to_layout():
+    # sin palabras clave, el parser de texto deja todo positivo y Checking no concilia
+    no_signs = SignRules(inflow=(), outflow=())
+    accounts = _by_name(Extractor(sign_rules=no_signs).extract(str(SAMPLE_PDF)))
+
+    checking = accounts["Checking"]
+    assert (checking.tier, checking.reconciled) == ("layout", True)
+    assert len(checking.transactions) == 16
+    assert any(t.amount < 0 for t in checking.transactions)
+
+    # Savings (un solo depósito) concilia con el parser barato
+    assert (accounts["Savings"].tier, accounts["Savings"].reconciled) == ("text", True)
+
+
+def test_text_strategy_never_runs_layout():
+    no_signs = SignRules(inflow=(), outflow=())
+    accounts = _by_name(Extractor(sign_rules=no_signs, strategy="text").extract(str(SAMPLE_PDF)))
+    assert (accounts["Checking"].tier, accounts["Checking"].reconciled) == ("text", False)
+
+
+def test_layout_over_budget_keeps_text_result():
+    no_signs = SignRules(inflow=(), outflow=())
+    extractor = Extractor(sign_rules=no_signs, budget=Budget(max_layout_chars=100))
+    result = extractor.extract(str(SAMPLE_PDF))
+
+    checking = _by_name(result)["Checking"]
+    assert (checking.tier, checking.reconciled) == ("text", False)
+    assert [(e.code, e.page) for e in result.errors] == [("layout_chars", 1)]
+
+
+def test_layout_parser_reads_only_the_account_band():
+    import pdfplumber
+
+    from extractor.banks.wells_fargo_layout import extract_transactions_layout
+
+    with pdfplumber.open(str(SAMPLE_PDF)) as pdf:
+        # como si otra cuenta ocupara la parte de arriba de la página 2
+        rows = [x for x in pdf.pages[1].extract_text_lines() if x["text"].startswith("4/4 ")]
+        band = {1: (rows[2]["top"], rows[-1]["bottom"])}
+        txs = extract_transactions_layout(pdf, [1], 2024, page_bounds=band)
+
+    assert [t.amount for t in txs] == [25.0, 40.0, -25.46, -1.0]
+    assert txs[0].description.startswith("Zelle From Lucelia")
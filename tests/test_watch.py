@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from extractor.metrics import DOCUMENTS, QUEUE_DEPTH
+from extractor.watch import LEDGER_NAME, FolderWatcher, Ledger
+
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "samples" / "wells_fargo_sample.pdf"
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_scan_debounces_files_still_being_written(tmp_path):
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    clock = _FakeClock()
+    watcher = FolderWatcher(in_dir, tmp_path / "out", settle_seconds=2.0, clock=clock)
+
+    pdf = in_dir / "a.pdf"
+    pdf.write_bytes(b"%PDF-1.4 parcial")
+    (in_dir / "notas.txt").write_text("ignorar")
+
+    assert watcher.scan() == []          # primera vez que se ve
+    clock.now = 1.0
+    with pdf.open("ab") as fh:           # sigue creciendo
+        fh.write(b" mas bytes")
+    assert watcher.scan() == []
+    clock.now = 2.5
+    assert watcher.scan() == []          # estable hace solo 1.5s
+    clock.now = 3.5
+    ready = watcher.scan()
+    assert [p for _, p in ready] == [pdf]
+
+
+def test_ledger_survives_restart(tmp_path):
+    ledger = Ledger(tmp_path / LEDGER_NAME)
+    ledger.record("a.pdf:1:1", "a.pdf", "processed", output="a.json")
+    ledger.record("b.pdf:1:1", "b.pdf", "failed", error="boom")
+
+    reloaded = Ledger(tmp_path / LEDGER_NAME)
+    assert "a.pdf:1:1" in reloaded
+    assert "b.pdf:1:1" in reloaded
+    assert "c.pdf:1:1" not in reloaded
+
+
+def test_watcher_extracts_dropped_pdf(tmp_path):
+    in_dir = tmp_path / "in"
+    out_dir = tmp_path / "out"
+    in_dir.mkdir()
+    shutil.copy(SAMPLE_PDF, in_dir / "wf.pdf")
+    (in_dir / "roto.pdf").write_bytes(b"esto no es un pdf")
+    ok_before, error_before = DOCUMENTS.value("ok"), DOCUMENTS.value("error")
+
+    with FolderWatcher(in_dir, out_dir, workers=1, settle_seconds=0.0) as watcher:
+        watcher.poll_once()   # descubre
+        watcher.poll_once()   # encola (estable)
+        deadline = time.monotonic() + 60
+        while watcher.busy and time.monotonic() < deadline:
+            time.sleep(0.1)
+            watcher.poll_once()
+
+    payload = json.loads((out_dir / "wf.json").read_text(encoding="utf-8"))
+    assert sum(len(a["transactions"]) for a in payload["accounts"]) == 17
+    assert not (out_dir / "roto.json").exists()
+
+    entries = [json.loads(x) for x in (out_dir / LEDGER_NAME).read_text(encoding="utf-8").splitlines()]
+    status = {e["file"]: e["status"] for e in entries}
+    assert status == {"wf.pdf": "processed", "roto.pdf": "failed"}
+
+    # las métricas de los workers llegan al proceso principal
+    assert DOCUMENTS.value("ok") == ok_before + 1
+    assert DOCUMENTS.value("error") == error_before + 1
+    assert QUEUE_DEPTH.value() == 0
+
+    # un segundo watcher no reprocesa lo que ya está en el ledger
+    again = FolderWatcher(in_dir, out_dir, settle_seconds=0.0)
+    again.scan()
+    assert again.scan() == []
+
+
+class _CrashingExtractor:
+    """Mata el proceso worker con a.pdf (como un OOM-kill / segfault)."""
+
+    def __init__(self, **kwargs) -> None:
+        from extractor.core import Extractor
+
+        self._inner = Extractor(**kwargs)
+
+    def extract(self, source):
+        if Path(source).name == "a.pdf":
+            os._exit(1)
+        return self._inner.extract(source)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="el parche llega a los workers vía fork")
+def test_watcher_survives_worker_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr("extractor.watch.Extractor", _CrashingExtractor)
+    in_dir = tmp_path / "in"
+    out_dir = tmp_path / "out"
+    in_dir.mkdir()
+    shutil.copy(SAMPLE_PDF, in_dir / "a.pdf")
+    shutil.copy(SAMPLE_PDF, in_dir / "wf.pdf")
+
+    def _drain(watcher: FolderWatcher) -> None:
+        deadline = time.monotonic() + 60
+        while watcher.busy and time.monotonic() < deadline:
+            time.sleep(0.1)
+            watcher.poll_once()
+
+    with FolderWatcher(in_dir, out_dir, workers=2, settle_seconds=0.0) as watcher:
+        watcher.poll_once()
+        watcher.poll_once()
+        _drain(watcher)
+
+        # el pool se reconstruyó: un archivo nuevo se sigue procesando
+        shutil.copy(SAMPLE_PDF, in_dir / "b.pdf")
+        watcher.poll_once()
+        watcher.poll_once()
+        _drain(watcher)
+
+    entries = [json.loads(x) for x in (out_dir / LEDGER_NAME).read_text(encoding="utf-8").splitlines()]
+    status = {e["file"]: e["status"] for e in entries}
+    assert status == {"a.pdf": "failed", "wf.pdf": "processed", "b.pdf": "processed"}
+    assert len(entries) == 3
+    assert next(e for e in entries if e["file"] == "a.pdf")["error"].startswith("WorkerCrashed")
@@ -57,13 +57,17 @@ def test_wells_fargo_sample_extract_structure_and_integrity():
     # Banco / año
     assert result.bank == "Wells Fargo"
     assert result.statement_year == 2024
+    assert result.period_end == "2024-04-05"
 
     # Cuentas esperadas
     names = [a.name for a in result.accounts]
     assert set(names) == {"Checking", "Savings"}, f"Cuentas detectadas inesperadas: {names}"
+    assert len(names) == 2, f"Cuentas duplicadas: {names}"
 
     # Conteos esperados por el sample
     by_name = {a.name: a for a in result.accounts}
+    assert by_name["Checking"].last4 == "2714"
+    assert by_name["Savings"].last4 == "4797"
     assert len(by_name["Checking"].transactions) == 16
     assert len(by_name["Savings"].transactions) == 1
     assert sum(len(a.transactions) for a in result.accounts) == 17